@@ -4,6 +4,24 @@ __version__ = "1.0.0"
 __author__ = "Marius"
 __description__ = "MQTT service for Varta battery integration with Home Assistant"
 
-from .service import main
+
+def main() -> None:
+    # Imported lazily: the service connects to MQTT at import time, which
+    # tools such as the soak harness need to set up first, and supervisor
+    # mode must not import it at all.
+    import os
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if os.getenv('SUPERVISOR_DEVICES_FILE'):
+        from .supervisor import main as supervisor_main
+
+        supervisor_main()
+    else:
+        from .service import main as service_main
+
+        service_main()
+
 
 __all__ = ['main']
@@ -1,5 +1,5 @@
 """Main entry point for varta_mqtt package."""
-from varta_mqtt.service import main
+from varta_mqtt import main
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import List, Optional
+
+
+class SystemClock:
+    """Wall-clock time; the default for everything outside the soak harness."""
+
+    @staticmethod
+    def time() -> float:
+        return time.time()
+
+    @staticmethod
+    def monotonic() -> float:
+        return time.monotonic()
+
+    @staticmethod
+    def sleep(seconds: float) -> None:
+        time.sleep(seconds)
+
+    @staticmethod
+    def wait(event: threading.Event, timeout: float) -> bool:
+        return event.wait(timeout=timeout)
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+class VirtualClock:
+    """Discrete-event clock shared by a fixed number of participant threads.
+
+    Time only moves when every participant is blocked in ``sleep`` or
+    ``wait``; it then jumps straight to the earliest wake-up. Work done
+    between sleeps (HTTP requests, Modbus reads, publishing) runs at real
+    speed, so days of polling compress into however long that work takes.
+    """
+
+    def __init__(self, participants: int, start: float = 0.0, epoch: float = 1_700_000_000.0) -> None:
+        self.participants = participants
+        self._now = start
+        self._epoch = epoch
+        self._cond = threading.Condition()
+        self._wake_times: List[float] = []
+        self._closed = False
+
+    def time(self) -> float:
+        return self._epoch + self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        self._block(seconds, None)
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        return self._block(timeout, event)
+
+    def close(self) -> None:
+        """Release every sleeper; later sleeps return immediately."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _block(self, seconds: float, event: Optional[threading.Event]) -> bool:
+        with self._cond:
+            wake_at = self._now + max(0.0, seconds)
+            self._wake_times.append(wake_at)
+            try:
+                while True:
+                    if event is not None and event.is_set():
+                        return True
+                    if self._closed or self._now >= wake_at:
+                        return False
+                    if len(self._wake_times) >= self.participants:
+                        earliest = min(self._wake_times)
+                        if earliest > self._now:
+                            self._now = earliest
+                            self._cond.notify_all()
+                            continue
+                    # Events are set without notifying the clock, so poll briefly
+                    self._cond.wait(timeout=0.05)
+            finally:
+                self._wake_times.remove(wake_at)
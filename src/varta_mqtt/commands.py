@@ -0,0 +1,149 @@
+import json
+import math
+import threading
+from typing import Any, Dict, Optional
+
+from varta_mqtt.clock import SYSTEM_CLOCK
+
+
+MIN_BOOST_INTERVAL_SECONDS = 0.2
+MAX_COMMAND_MINUTES = 60
+DEFAULT_COMMAND_MINUTES = 5
+PAUSE_CHECK_SECONDS = 60
+
+COMMANDS = {'refresh', 'boost', 'pause', 'resume'}
+TARGETS = {'api', 'modbus', 'all'}
+
+
+class RateController:
+    """Poll interval for one loop with self-expiring boosts and pauses.
+
+    Loops sleep through ``sleep`` so a refresh or resume request wakes them
+    immediately instead of waiting out the current interval.
+    """
+
+    def __init__(self, baseline: float, clock: Any = SYSTEM_CLOCK) -> None:
+        self.baseline = baseline
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._boost_interval: Optional[float] = None
+        self._boost_until = 0.0
+        self._paused_until = 0.0
+        self._refresh_requested = False
+
+    def interval(self) -> float:
+        with self._lock:
+            if self._boost_interval is not None and self._clock.monotonic() < self._boost_until:
+                return min(self._boost_interval, self.baseline)
+            self._boost_interval = None
+            return self.baseline
+
+    def boosted_interval(self) -> Optional[float]:
+        """The interval of the active boost, or None when no boost is running."""
+        interval = self.interval()
+        with self._lock:
+            return interval if self._boost_interval is not None else None
+
+    def set_baseline(self, baseline: float) -> None:
+        """Change the regular interval; a sleeping loop picks it up right away."""
+        with self._lock:
+            self.baseline = baseline
+        self._wake.set()
+
+    def boost(self, interval: float, duration: float) -> None:
+        """Poll every ``interval`` seconds for ``duration`` seconds.
+
+        The interval is clamped between MIN_BOOST_INTERVAL_SECONDS and the
+        baseline, so a boost never slows a loop down.
+        """
+        if not (math.isfinite(interval) and math.isfinite(duration)):
+            raise ValueError("boost interval and duration must be finite")
+        with self._lock:
+            self._boost_interval = min(max(interval, MIN_BOOST_INTERVAL_SECONDS), self.baseline)
+            self._boost_until = self._clock.monotonic() + duration
+        self._wake.set()
+
+    def pause(self, duration: float) -> None:
+        with self._lock:
+            self._paused_until = self._clock.monotonic() + duration
+
+    def resume(self) -> None:
+        with self._lock:
+            self._paused_until = 0.0
+            self._boost_interval = None
+        self._wake.set()
+
+    def pause_remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._paused_until - self._clock.monotonic())
+
+    def is_paused(self) -> bool:
+        return self.pause_remaining() > 0
+
+    def request_refresh(self) -> None:
+        with self._lock:
+            self._refresh_requested = True
+        self._wake.set()
+
+    def consume_refresh(self) -> bool:
+        with self._lock:
+            requested = self._refresh_requested
+            self._refresh_requested = False
+            return requested
+
+    def sleep(self, seconds: float) -> bool:
+        """Sleep up to ``seconds``. Returns True when woken early by a command."""
+        woken = self._clock.wait(self._wake, max(0.0, seconds))
+        self._wake.clear()
+        return woken
+
+    def wait_while_paused(self) -> None:
+        self.sleep(min(self.pause_remaining(), PAUSE_CHECK_SECONDS))
+
+
+def parse_command(payload: bytes) -> Dict[str, Any]:
+    """Parse a command message.
+
+    Accepts a bare command name (``refresh``) or a JSON object such as
+    ``{"command": "boost", "target": "modbus", "interval": 0.5, "minutes": 5}``.
+    Raises ValueError for anything else.
+    """
+    text = payload.decode('utf-8', errors='replace').strip()
+    if text.startswith('{'):
+        try:
+            command = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Invalid command JSON: {exc}") from exc
+        if not isinstance(command, dict):
+            raise ValueError("Command must be a JSON object")
+    else:
+        command = {'command': text}
+
+    name = str(command.get('command', '')).lower()
+    if name not in COMMANDS:
+        raise ValueError(f"Unknown command: {name or text!r}")
+
+    target = str(command.get('target', 'all')).lower()
+    if target not in TARGETS:
+        raise ValueError(f"Unknown command target: {target}")
+
+    try:
+        minutes = float(command.get('minutes', DEFAULT_COMMAND_MINUTES))
+        interval = float(command['interval']) if 'interval' in command else None
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid command value: {exc}") from exc
+
+    if not math.isfinite(minutes) or (interval is not None and not math.isfinite(interval)):
+        raise ValueError("minutes and interval must be finite numbers")
+    if minutes <= 0:
+        raise ValueError("minutes must be positive")
+    if name == 'boost' and interval is None:
+        raise ValueError("boost requires an interval in seconds")
+
+    return {
+        'command': name,
+        'target': target,
+        'minutes': min(minutes, MAX_COMMAND_MINUTES),
+        'interval': interval,
+    }
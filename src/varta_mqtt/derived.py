@@ -0,0 +1,178 @@
+import ast
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Set
+
+
+# Functions an expression may call; nothing else is reachable from eval
+FUNCTIONS = {'abs': abs, 'min': min, 'max': max, 'round': round}
+
+# Arithmetic, comparisons and conditionals only. Pow is left out so an
+# expression cannot build huge numbers.
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.BoolOp,
+    ast.Compare,
+    ast.IfExp,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.UAdd,
+    ast.USub,
+    ast.Not,
+    ast.And,
+    ast.Or,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+)
+
+
+class Expression:
+    """A derived-sensor expression, validated and compiled once."""
+
+    def __init__(self, name: str, source: str) -> None:
+        try:
+            tree = ast.parse(source, mode='eval')
+        except SyntaxError as exc:
+            raise ValueError(f"{name}: invalid expression: {exc.msg}") from exc
+
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise ValueError(f"{name}: {type(node).__name__} is not allowed in expressions")
+            if isinstance(node, ast.Call) and (
+                not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords
+            ):
+                raise ValueError(f"{name}: only {', '.join(sorted(FUNCTIONS))} may be called")
+            if isinstance(node, ast.Constant) and (
+                isinstance(node.value, bool) or not isinstance(node.value, (int, float))
+            ):
+                raise ValueError(f"{name}: only numeric constants are allowed")
+
+        self.name = name
+        self.source = source
+        self.inputs: FrozenSet[str] = frozenset(
+            node.id for node in ast.walk(tree) if isinstance(node, ast.Name) and node.id not in FUNCTIONS
+        )
+        self._code = compile(tree, f'<derived {name}>', 'eval')
+
+    def evaluate(self, values: Mapping[str, float]) -> Any:
+        return eval(self._code, {'__builtins__': {}, **FUNCTIONS}, values)  # pylint: disable=eval-used
+
+
+def _dependency_order(expressions: Mapping[str, Expression]) -> List[str]:
+    order: List[str] = []
+    state: Dict[str, bool] = {}  # False while visiting, True when done
+
+    def visit(name: str, chain: List[str]) -> None:
+        if state.get(name) is True:
+            return
+        if state.get(name) is False:
+            raise ValueError(f"Derived sensors depend on each other: {' -> '.join(chain + [name])}")
+        state[name] = False
+        for dependency in sorted(expressions[name].inputs & expressions.keys()):
+            visit(dependency, chain + [name])
+        state[name] = True
+        order.append(name)
+
+    for name in expressions:
+        visit(name, [])
+    return order
+
+
+class DerivedMetrics:
+    """Evaluate derived sensors against the latest input values.
+
+    ``update`` takes whatever inputs a snapshot carries and recomputes only
+    the outputs that depend on a changed value, in dependency order, so one
+    derived sensor can build on another.
+    """
+
+    def __init__(self, definitions: Mapping[str, str]) -> None:
+        self._expressions = {name: Expression(name, source) for name, source in definitions.items()}
+        self._order = _dependency_order(self._expressions)
+        self._dependents: Dict[str, Set[str]] = {}
+        for name, expression in self._expressions.items():
+            for dependency in expression.inputs:
+                self._dependents.setdefault(dependency, set()).add(name)
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+
+    @property
+    def inputs(self) -> FrozenSet[str]:
+        """Names the expressions read that are not derived themselves."""
+        names: Set[str] = set()
+        for expression in self._expressions.values():
+            names |= expression.inputs
+        return frozenset(names - self._expressions.keys())
+
+    def update(self, values: Mapping[str, float]) -> Dict[str, Any]:
+        """Record new input values and return the outputs that were recomputed.
+
+        Outputs with a missing input, or whose expression fails (for
+        example a division by zero), are left out until they can be computed.
+        """
+        with self._lock:
+            dirty: Set[str] = set()
+            for name, value in values.items():
+                if name in self._expressions or self._values.get(name) == value:
+                    continue
+                self._values[name] = value
+                dirty |= self._dependents.get(name, set())
+
+            results: Dict[str, Any] = {}
+            for name in self._order:
+                if name not in dirty:
+                    continue
+                expression = self._expressions[name]
+                if not expression.inputs <= self._values.keys():
+                    continue
+                try:
+                    value = expression.evaluate(self._values)
+                except (ArithmeticError, TypeError):
+                    value = None
+
+                if value is None:
+                    if self._values.pop(name, None) is not None:
+                        dirty |= self._dependents.get(name, set())
+                    continue
+                if self._values.get(name) != value:
+                    dirty |= self._dependents.get(name, set())
+                self._values[name] = value
+                results[name] = value
+            return results
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def forget(self, names: Iterable[str]) -> Set[str]:
+        """Drop input values and everything computed from them.
+
+        Returns the outputs that had a value; they stay absent until all of
+        their inputs are supplied again.
+        """
+        with self._lock:
+            pending = list(names)
+            stale = set(pending)
+            while pending:
+                for dependent in self._dependents.get(pending.pop(), ()):
+                    if dependent not in stale:
+                        stale.add(dependent)
+                        pending.append(dependent)
+
+            dropped = {name for name in stale if name in self._expressions and name in self._values}
+            for name in stale:
+                self._values.pop(name, None)
+            return dropped
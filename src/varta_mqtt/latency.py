@@ -0,0 +1,47 @@
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict, List
+
+
+LATENCY_WINDOW = 1000
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class LatencyTracker:
+    """Sample-to-publish latency per data source over the last N publishes."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, source: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(source)
+            if samples is None:
+                samples = self._samples[source] = deque(maxlen=self.window)
+            samples.append(max(0.0, seconds))
+
+    def summary(self, source: str) -> Dict[str, float]:
+        """Return count and p50/p95/p99 in milliseconds for one source."""
+        with self._lock:
+            values = list(self._samples.get(source, ()))
+        ordered = sorted(values)
+        return {
+            'count': len(ordered),
+            'p50_ms': round(percentile(ordered, 50) * 1000, 1),
+            'p95_ms': round(percentile(ordered, 95) * 1000, 1),
+            'p99_ms': round(percentile(ordered, 99) * 1000, 1),
+        }
+
+    def sources(self) -> List[str]:
+        with self._lock:
+            return list(self._samples)
@@ -0,0 +1,155 @@
+import atexit
+import logging
+import math
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+LOG_QUEUE_SIZE = 10000
+# How often dropped records are reported when repeat collapsing is off
+DROP_REPORT_SECONDS = 60.0
+
+_RepeatKey = Tuple[str, int, str]
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: 'queue.Queue[logging.LogRecord]') -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def take_dropped(self) -> int:
+        """Return the number of records dropped since the last call."""
+        with self.lock:  # type: ignore[union-attr]
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+def report_dropped(queue_handler: DroppingQueueHandler, sink: logging.Handler) -> int:
+    """Log how many records were dropped since the last report, straight to the sink.
+
+    The report bypasses the queue, which may still be full.
+    """
+    dropped = queue_handler.take_dropped()
+    if dropped:
+        sink.handle(logging.makeLogRecord({
+            'name': __name__,
+            'levelno': logging.WARNING,
+            'levelname': logging.getLevelName(logging.WARNING),
+            'msg': "%d log records dropped, log output is too slow",
+            'args': (dropped,),
+        }))
+    return dropped
+
+
+class RepeatSummaryFilter(logging.Filter):
+    """Let the first of a run of identical warnings through, count the rest.
+
+    Suppressed repeats are reported by ``flush`` once their window has
+    passed, so an outage logs one line per window instead of one per cycle.
+    """
+
+    def __init__(self, window: float = 300.0, min_level: int = logging.WARNING) -> None:
+        super().__init__()
+        self.window = window
+        self.min_level = min_level
+        self._lock = threading.Lock()
+        self._seen: Dict[_RepeatKey, List[float]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or getattr(record, 'repeat_summary', False):
+            return True
+
+        message = record.getMessage()
+        key = (record.name, record.levelno, message)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            self._seen[key] = [now, 0]
+
+        if entry is not None and entry[1]:
+            # The window ran out before flush picked it up; report inline
+            record.msg = f"{message} (repeated {int(entry[1])} more times in the last {now - entry[0]:.0f}s)"
+            record.args = ()
+        return True
+
+    def flush(self, force: bool = False) -> List[Tuple[_RepeatKey, int, float]]:
+        """Return (key, count, span) for expired runs and forget them."""
+        now = time.monotonic()
+        summaries = []
+        with self._lock:
+            for key, (started, suppressed) in list(self._seen.items()):
+                if not force and now - started < self.window:
+                    continue
+                del self._seen[key]
+                if suppressed:
+                    summaries.append((key, int(suppressed), now - started))
+        return summaries
+
+    def emit_summaries(self, force: bool = False) -> None:
+        for (name, level, message), count, span in self.flush(force=force):
+            logging.getLogger(name).log(
+                level,
+                "%s (repeated %d more times in the last %.0fs)",
+                message,
+                count,
+                span,
+                extra={'repeat_summary': True},
+            )
+
+
+def configure_logging(level: str = 'INFO', repeat_window: float = 300.0) -> QueueListener:
+    """Route all logging through a bounded queue drained by a background thread.
+
+    Producers never wait on the sink: when stdout is slow the queue fills up
+    and further records are dropped rather than stalling the polling loops.
+    A ``repeat_window`` of 0 turns off collapsing of repeated warnings.
+    """
+    if not (math.isfinite(repeat_window) and repeat_window >= 0):
+        raise ValueError(f"repeat_window must be a non-negative number, got {repeat_window}")
+
+    log_queue: 'queue.Queue[logging.LogRecord]' = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    repeat_filter: Optional[RepeatSummaryFilter] = None
+    if repeat_window > 0:
+        repeat_filter = RepeatSummaryFilter(window=repeat_window)
+        queue_handler.addFilter(repeat_filter)
+
+    def _summarize() -> None:
+        while True:
+            time.sleep(repeat_window / 2 if repeat_filter is not None else DROP_REPORT_SECONDS)
+            if repeat_filter is not None:
+                repeat_filter.emit_summaries()
+            report_dropped(queue_handler, stream_handler)
+
+    threading.Thread(target=_summarize, daemon=True, name='log-summary').start()
+    return listener
@@ -0,0 +1,145 @@
+import logging
+import socket
+import socketserver
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from varta_mqtt.clock import SYSTEM_CLOCK
+
+
+logger = logging.getLogger(__name__)
+
+READ_FUNCTION_CODES = (3, 4)
+MAX_READ_COUNT = 125
+
+ILLEGAL_FUNCTION = 0x01
+ILLEGAL_DATA_ADDRESS = 0x02
+ILLEGAL_DATA_VALUE = 0x03
+SERVER_DEVICE_FAILURE = 0x04
+GATEWAY_TARGET_FAILED = 0x0B
+
+
+def exception_response(function_code: int, code: int) -> bytes:
+    return bytes([function_code | 0x80, code])
+
+
+class RegisterImage:
+    """Last polled value of each mirrored register.
+
+    Holding (FC3) and input (FC4) reads are both served from the same
+    image. Registers older than ``max_age`` seconds, or never polled, are
+    answered with a gateway-target-failed exception so clients notice when
+    the battery stopped answering instead of reading frozen values.
+    """
+
+    def __init__(
+        self,
+        addresses: Optional[List[int]] = None,
+        max_age: Optional[float] = None,
+        clock: Any = SYSTEM_CLOCK,
+    ) -> None:
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._addresses = set(addresses or ())
+        self._registers: Dict[int, Tuple[int, float]] = {}
+
+    def update(self, registers: Mapping[int, int]) -> None:
+        """Store register values; signed values are stored as their 16-bit pattern."""
+        now = self._clock.monotonic()
+        with self._lock:
+            for address, value in registers.items():
+                self._addresses.add(address)
+                self._registers[address] = (value & 0xFFFF, now)
+
+    def respond(self, pdu: bytes) -> bytes:
+        """Answer one request PDU with a response or exception PDU."""
+        function_code = pdu[0]
+        if function_code not in READ_FUNCTION_CODES:
+            return exception_response(function_code, ILLEGAL_FUNCTION)
+        if len(pdu) != 5:
+            return exception_response(function_code, ILLEGAL_DATA_VALUE)
+
+        address, count = struct.unpack('>HH', pdu[1:5])
+        if not 1 <= count <= MAX_READ_COUNT:
+            return exception_response(function_code, ILLEGAL_DATA_VALUE)
+
+        now = self._clock.monotonic()
+        values = []
+        with self._lock:
+            for register in range(address, address + count):
+                if register not in self._addresses:
+                    return exception_response(function_code, ILLEGAL_DATA_ADDRESS)
+                entry = self._registers.get(register)
+                if entry is None or (self.max_age is not None and now - entry[1] > self.max_age):
+                    return exception_response(function_code, GATEWAY_TARGET_FAILED)
+                values.append(entry[0])
+
+        return struct.pack(f'>BB{count}H', function_code, 2 * count, *values)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class ModbusTcpServer:
+    """Minimal Modbus TCP server; ``respond`` maps a request PDU to a response PDU.
+
+    Each client connection gets its own thread and may pipeline requests.
+    Any unit id is accepted and echoed back.
+    """
+
+    def __init__(self, respond: Callable[[bytes], bytes], host: str = '127.0.0.1', port: int = 502) -> None:
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                try:
+                    self._serve()
+                except OSError:
+                    pass  # Client went away mid-request
+
+            def _serve(self) -> None:
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                while True:
+                    header = _recv_exact(self.request, 7)
+                    if header is None:
+                        return
+                    transaction_id, protocol_id, length, unit_id = struct.unpack('>HHHB', header)
+                    if protocol_id != 0 or not 2 <= length <= 254:
+                        return
+                    pdu = _recv_exact(self.request, length - 1)
+                    if pdu is None:
+                        return
+                    response = respond(pdu)
+                    self.request.sendall(struct.pack('>HHHB', transaction_id, 0, len(response) + 1, unit_id) + response)
+
+        self.server = _ThreadingTCPServer((host, port), Handler)
+
+    @property
+    def port(self) -> int:
+        return self.server.server_address[1]
+
+    def start(self, name: str = 'modbus-mirror') -> None:
+        threading.Thread(target=self.server.serve_forever, daemon=True, name=name).start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def start_modbus_mirror(image: RegisterImage, host: str, port: int) -> ModbusTcpServer:
+    server = ModbusTcpServer(image.respond, host=host, port=port)
+    server.start()
+    logger.info("Modbus mirror listening on %s:%s", host, server.port)
+    return server
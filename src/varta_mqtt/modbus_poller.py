@@ -1,5 +1,7 @@
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from varta_mqtt.clock import SYSTEM_CLOCK
 
 
 logger = logging.getLogger(__name__)
@@ -13,7 +15,14 @@ class ModbusPoller:
         "grid_power_total_w": 1078,
     }
 
-    def __init__(self, host: str, port: int = 502, unit_id: int = 1, timeout: float = 5.0):
+    def __init__(
+        self,
+        host: str,
+        port: int = 502,
+        unit_id: int = 1,
+        timeout: float = 5.0,
+        clock: Any = SYSTEM_CLOCK,
+    ):
         try:
             from pymodbus.client import ModbusTcpClient  # type: ignore[import-not-found]
         except ImportError as exc:
@@ -26,7 +35,10 @@ class ModbusPoller:
         self.unit_id = unit_id
         self.timeout = timeout
         self._client_type = ModbusTcpClient
+        self._clock = clock
         self.client: Any = None
+        # Wall-clock time the last successful poll was requested
+        self.last_polled_at: Optional[float] = None
 
     def connect(self) -> bool:
         """Ensure an active TCP connection to the Modbus endpoint."""
@@ -67,8 +79,14 @@ class ModbusPoller:
         return self._to_int16(int(response.registers[0]))
 
     def poll_values(self) -> Dict[str, int]:
-        """Poll all required power values from Modbus."""
+        """Poll all required power values from Modbus.
+
+        ``last_polled_at`` is updated to the time the poll started once every
+        register has been read.
+        """
+        started = self._clock.time()
         values: Dict[str, int] = {}
         for sensor_key, address in self.REGISTER_MAP.items():
             values[sensor_key] = self._read_int16_register(address)
+        self.last_polled_at = started
         return values
@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Generic, NamedTuple, Optional, TypeVar
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class Measured(NamedTuple):
+    """A pipeline payload together with the wall-clock time it was measured."""
+
+    payload: Any
+    measured_at: float
+
+
+class LatestSlot(Generic[T]):
+    """Single-slot buffer between pipeline stages.
+
+    A new value always replaces an unconsumed one, so a slow consumer only
+    ever sees the most recent snapshot and never backs up the producer.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._value: Optional[T] = None
+        self._has_value = False
+        self.dropped = 0
+
+    def put(self, value: T) -> None:
+        with self._cond:
+            if self._has_value:
+                self.dropped += 1
+            self._value = value
+            self._has_value = True
+            self._cond.notify_all()
+
+    def take(self, timeout: Optional[float] = None) -> Optional[T]:
+        """Wait for a value and consume it. Returns None on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._has_value, timeout=timeout):
+                return None
+            value = self._value
+            self._value = None
+            self._has_value = False
+            return value
+
+
+class Stage:
+    """Consume from an inbox, transform, and hand the result to an outbox.
+
+    Each stage runs in its own thread and keeps its own timing, so a slow
+    stage only causes stale snapshots to be dropped upstream.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        work: Callable[[Any], Any],
+        inbox: LatestSlot,
+        outbox: Optional[LatestSlot] = None,
+    ) -> None:
+        self.name = name
+        self.work = work
+        self.inbox = inbox
+        self.outbox = outbox
+        self.cycles = 0
+        self.last_duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self, timeout: Optional[float] = None) -> bool:
+        item = self.inbox.take(timeout=timeout)
+        if item is None:
+            return False
+
+        started = time.perf_counter()
+        result = self.work(item)
+        self.last_duration = time.perf_counter() - started
+        self.cycles += 1
+
+        if result is not None and self.outbox is not None:
+            self.outbox.put(result)
+        return True
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once(timeout=1.0)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Pipeline stage %s failed", self.name)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.run, daemon=True, name=self.name)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('sensors', 'modbus', 'status', 'latency', 'raw')
+
+
+class SnapshotStore:
+    """Latest service state for local readers.
+
+    Each section is serialised at most once per update, no matter how many
+    clients read it, and carries an ETag so unchanged polls cost a 304.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sections: Dict[str, Dict[str, Any]] = {name: {} for name in SECTIONS}
+        self._generations: Dict[str, int] = {name: 0 for name in SECTIONS}
+        self._cache: Dict[str, Tuple[str, bytes]] = {}
+
+    def update_entries(
+        self,
+        section: str,
+        values: Dict[str, Any],
+        updated_at: Optional[float] = None,
+        **fields: Any,
+    ) -> None:
+        """Store values with a per-value timestamp and optional extra fields."""
+        if updated_at is None:
+            updated_at = time.time()
+        with self._lock:
+            entries = self._sections[section]
+            for key, value in values.items():
+                entries[key] = {'value': value, 'updated_at': updated_at, **fields}
+            self._invalidate(section)
+
+    def remove_entries(self, section: str, keys: Iterable[str]) -> None:
+        with self._lock:
+            entries = self._sections[section]
+            removed = [key for key in keys if entries.pop(key, None) is not None]
+            if removed:
+                self._invalidate(section)
+
+    def set_raw(self, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._sections['raw'] = data
+            self._invalidate('raw')
+
+    def _invalidate(self, section: str) -> None:
+        self._generations[section] += 1
+        self._cache.pop(section, None)
+        self._cache.pop('', None)
+
+    def render(self, section: str) -> Optional[Tuple[str, bytes]]:
+        """Return (etag, body) for a section, or the whole snapshot for ''."""
+        if section and section not in SECTIONS:
+            return None
+
+        with self._lock:
+            cached = self._cache.get(section)
+            if cached is not None:
+                return cached
+
+            if section:
+                document: Any = self._sections[section]
+                etag = f'"{section}-{self._generations[section]}"'
+            else:
+                document = {name: self._sections[name] for name in SECTIONS if name != 'raw'}
+                etag = '"' + '-'.join(str(self._generations[name]) for name in SECTIONS) + '"'
+
+            rendered = (etag, json.dumps(document).encode('utf-8'))
+            self._cache[section] = rendered
+            return rendered
+
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    """Serve SnapshotStore sections: /, /sensors, /modbus, /status, /latency, /raw."""
+
+    server_version = 'VartaMQTT'
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        store: SnapshotStore = self.server.store  # type: ignore[attr-defined]
+        rendered = store.render(self.path.split('?', 1)[0].strip('/'))
+        if rendered is None:
+            self.send_error(404)
+            return
+
+        etag, body = rendered
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) tuple
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class UnixSnapshotServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def start_read_api(
+    store: SnapshotStore,
+    host: str = '127.0.0.1',
+    port: Optional[int] = None,
+    socket_path: Optional[str] = None,
+) -> list:
+    """Start the TCP and/or Unix socket listeners in background threads."""
+    servers: list = []
+
+    if port is not None:
+        tcp_server = ThreadingHTTPServer((host, port), SnapshotRequestHandler)
+        tcp_server.daemon_threads = True
+        servers.append(tcp_server)
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        servers.append(UnixSnapshotServer(socket_path, SnapshotRequestHandler))
+
+    for server in servers:
+        server.store = store  # type: ignore[attr-defined]
+        threading.Thread(target=server.serve_forever, daemon=True, name='read-api').start()
+
+    return servers
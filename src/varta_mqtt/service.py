@@ -1,49 +1,174 @@
 import json
+import logging
+import math
 import os
+import signal
 import threading
 import time
 from datetime import datetime
-from typing import Any, Dict, Optional, cast
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Set, cast
 
 import requests
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv, load_dotenv
 from paho.mqtt import client as mqtt_client
 
+from varta_mqtt.commands import RateController, parse_command
+from varta_mqtt.derived import DerivedMetrics
+from varta_mqtt.latency import LatencyTracker
+from varta_mqtt.logging_config import configure_logging
+from varta_mqtt.modbus_mirror import RegisterImage, start_modbus_mirror
 from varta_mqtt.modbus_poller import ModbusPoller
+from varta_mqtt.pipeline import LatestSlot, Measured, Stage
+from varta_mqtt.read_api import SnapshotStore, start_read_api
+
+ENV_FILE = find_dotenv()
+# The process environment (e.g. docker run -e) overrides .env, at startup and on reload
+PROCESS_ENVIRON = dict(os.environ)
+load_dotenv(ENV_FILE)
+
+logger = logging.getLogger(__name__)
+
+
+# Range checks applied by validate_settings
+POSITIVE_SETTINGS = (
+    'INTERVAL_SECONDS',
+    'MODBUS_TIMEOUT_SECONDS',
+    'MODBUS_POLLING_INTERVAL_SECONDS',
+    'MODBUS_PUBLISH_INTERVAL_SECONDS',
+    'MODBUS_MIRROR_MAX_AGE_SECONDS',
+)
+NON_NEGATIVE_SETTINGS = (
+    'MODBUS_IMMEDIATE_THRESHOLD_W',
+    'MODBUS_IMMEDIATE_MIN_GAP_SECONDS',
+    'CONFIG_WATCH_INTERVAL_SECONDS',
+    'LOG_REPEAT_WINDOW_SECONDS',
+)
+PORT_SETTINGS = ('MQTT_PORT', 'MODBUS_PORT', 'MODBUS_MIRROR_PORT', 'READ_API_PORT')
+
+
+def read_settings(environ: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """Parse and validate all settings (default: from the process environment).
+
+    Raises ValueError for a missing, unparsable or out-of-range value.
+    """
+    env = os.environ if environ is None else environ
+    settings = {
+        'API_URL': env.get('API_URL'),
+        'LOGIN_URL': env.get('LOGIN_URL'),
+        'API_USERNAME': env.get('API_USERNAME'),
+        'API_PASSWORD': env.get('API_PASSWORD'),
+        'MQTT_BROKER': env.get('MQTT_BROKER'),
+        'MQTT_PORT': int(env.get('MQTT_PORT', 1883)),
+        'MQTT_USERNAME': env.get('MQTT_USERNAME'),
+        'MQTT_PASSWORD': env.get('MQTT_PASSWORD'),
+        'DEVICE_NAME': env.get('DEVICE_NAME', 'varta_battery'),
+        'INTERVAL_SECONDS': int(env.get('INTERVAL_SECONDS', 1)),
+        'DISABLED_SENSORS': frozenset(
+            key.strip() for key in env.get('DISABLED_SENSORS', '').split(',') if key.strip()
+        ),
+        'MODBUS_HOST': env.get('MODBUS_HOST'),
+        'MODBUS_PORT': int(env.get('MODBUS_PORT', 502)),
+        'MODBUS_UNIT_ID': int(env.get('MODBUS_UNIT_ID', 1)),
+        'MODBUS_TIMEOUT_SECONDS': float(env.get('MODBUS_TIMEOUT_SECONDS', 5)),
+        'MODBUS_POLLING_INTERVAL_SECONDS': int(env.get('MODBUS_POLLING_INTERVAL_SECONDS', 1)),
+        'MODBUS_PUBLISH_INTERVAL_SECONDS': int(env.get('MODBUS_PUBLISH_INTERVAL_SECONDS', 10)),
+        'MODBUS_IMMEDIATE_THRESHOLD_W': float(env.get('MODBUS_IMMEDIATE_THRESHOLD_W', 0)),
+        'MODBUS_IMMEDIATE_MIN_GAP_SECONDS': float(env.get('MODBUS_IMMEDIATE_MIN_GAP_SECONDS', 2)),
+        'MODBUS_MIRROR_HOST': env.get('MODBUS_MIRROR_HOST', '127.0.0.1'),
+        'MODBUS_MIRROR_PORT': int(env.get('MODBUS_MIRROR_PORT', 0)),
+        'MODBUS_MIRROR_MAX_AGE_SECONDS': float(env.get('MODBUS_MIRROR_MAX_AGE_SECONDS', 10)),
+        'SESSION_COOKIE_FILE': env.get('SESSION_COOKIE_FILE'),
+        'LOG_LEVEL': env.get('LOG_LEVEL', 'INFO'),
+        'LOG_REPEAT_WINDOW_SECONDS': float(env.get('LOG_REPEAT_WINDOW_SECONDS', 300)),
+        'CONFIG_WATCH_INTERVAL_SECONDS': float(env.get('CONFIG_WATCH_INTERVAL_SECONDS', 0)),
+        'MQTT_COMMANDS_ENABLED': env.get('MQTT_COMMANDS_ENABLED', 'true').lower() in ('1', 'true', 'yes'),
+        'READ_API_HOST': env.get('READ_API_HOST', '127.0.0.1'),
+        'READ_API_PORT': int(env.get('READ_API_PORT', 0)),
+        'READ_API_SOCKET': env.get('READ_API_SOCKET'),
+    }
+    validate_settings(settings)
+    return settings
+
+
+def validate_settings(settings: Dict[str, Any]) -> None:
+    if not settings['API_URL'] or not settings['MQTT_BROKER']:
+        raise ValueError("API_URL and MQTT_BROKER must be set in .env")
+    for name in POSITIVE_SETTINGS:
+        if not (math.isfinite(settings[name]) and settings[name] > 0):
+            raise ValueError(f"{name} must be a positive number, got {settings[name]}")
+    for name in NON_NEGATIVE_SETTINGS:
+        if not (math.isfinite(settings[name]) and settings[name] >= 0):
+            raise ValueError(f"{name} must not be negative, got {settings[name]}")
+    for name in PORT_SETTINGS:
+        if not 0 <= settings[name] <= 65535:
+            raise ValueError(f"{name} must be a TCP port, got {settings[name]}")
+    if not isinstance(logging.getLevelName(settings['LOG_LEVEL'].upper()), int):
+        raise ValueError(f"Unknown LOG_LEVEL: {settings['LOG_LEVEL']}")
+    if settings['MODBUS_HOST'] and settings['MODBUS_PUBLISH_INTERVAL_SECONDS'] < settings['MODBUS_POLLING_INTERVAL_SECONDS']:
+        raise ValueError("MODBUS_PUBLISH_INTERVAL_SECONDS must be >= MODBUS_POLLING_INTERVAL_SECONDS")
 
-load_dotenv()
 
 # Load environment variables
-API_URL = os.getenv('API_URL')
-LOGIN_URL = os.getenv('LOGIN_URL')
-API_USERNAME = os.getenv('API_USERNAME')
-API_PASSWORD = os.getenv('API_PASSWORD')
-MQTT_BROKER = os.getenv('MQTT_BROKER')
-MQTT_PORT = int(os.getenv('MQTT_PORT', 1883))
-MQTT_USERNAME = os.getenv('MQTT_USERNAME')
-MQTT_PASSWORD = os.getenv('MQTT_PASSWORD')
-DEVICE_NAME = os.getenv('DEVICE_NAME', 'varta_battery')
-INTERVAL_SECONDS = int(os.getenv('INTERVAL_SECONDS', 1))
-
-MODBUS_HOST = os.getenv('MODBUS_HOST')
-MODBUS_PORT = int(os.getenv('MODBUS_PORT', 502))
-MODBUS_UNIT_ID = int(os.getenv('MODBUS_UNIT_ID', 1))
-MODBUS_TIMEOUT_SECONDS = float(os.getenv('MODBUS_TIMEOUT_SECONDS', 5))
-MODBUS_POLLING_INTERVAL_SECONDS = int(os.getenv('MODBUS_POLLING_INTERVAL_SECONDS', 1))
-MODBUS_PUBLISH_INTERVAL_SECONDS = int(os.getenv('MODBUS_PUBLISH_INTERVAL_SECONDS', 10))
+_settings = read_settings()
+API_URL = _settings['API_URL']
+LOGIN_URL = _settings['LOGIN_URL']
+API_USERNAME = _settings['API_USERNAME']
+API_PASSWORD = _settings['API_PASSWORD']
+MQTT_BROKER = _settings['MQTT_BROKER']
+MQTT_PORT = _settings['MQTT_PORT']
+MQTT_USERNAME = _settings['MQTT_USERNAME']
+MQTT_PASSWORD = _settings['MQTT_PASSWORD']
+DEVICE_NAME = _settings['DEVICE_NAME']
+INTERVAL_SECONDS = _settings['INTERVAL_SECONDS']
+DISABLED_SENSORS = _settings['DISABLED_SENSORS']
+
+MODBUS_HOST = _settings['MODBUS_HOST']
+MODBUS_PORT = _settings['MODBUS_PORT']
+MODBUS_UNIT_ID = _settings['MODBUS_UNIT_ID']
+MODBUS_TIMEOUT_SECONDS = _settings['MODBUS_TIMEOUT_SECONDS']
+MODBUS_POLLING_INTERVAL_SECONDS = _settings['MODBUS_POLLING_INTERVAL_SECONDS']
+MODBUS_PUBLISH_INTERVAL_SECONDS = _settings['MODBUS_PUBLISH_INTERVAL_SECONDS']
+MODBUS_IMMEDIATE_THRESHOLD_W = _settings['MODBUS_IMMEDIATE_THRESHOLD_W']
+MODBUS_IMMEDIATE_MIN_GAP_SECONDS = _settings['MODBUS_IMMEDIATE_MIN_GAP_SECONDS']
 MODBUS_ENABLED = bool(MODBUS_HOST)
 
-if not API_URL or not MQTT_BROKER:
-    raise ValueError("API_URL and MQTT_BROKER must be set in .env")
+MODBUS_MIRROR_HOST = _settings['MODBUS_MIRROR_HOST']
+MODBUS_MIRROR_PORT = _settings['MODBUS_MIRROR_PORT']
+MODBUS_MIRROR_MAX_AGE_SECONDS = _settings['MODBUS_MIRROR_MAX_AGE_SECONDS']
+
+SESSION_COOKIE_FILE = _settings['SESSION_COOKIE_FILE']
+
+LOG_LEVEL = _settings['LOG_LEVEL']
+LOG_REPEAT_WINDOW_SECONDS = _settings['LOG_REPEAT_WINDOW_SECONDS']
+CONFIG_WATCH_INTERVAL_SECONDS = _settings['CONFIG_WATCH_INTERVAL_SECONDS']
+
+MQTT_COMMANDS_ENABLED = _settings['MQTT_COMMANDS_ENABLED']
+COMMAND_TOPIC = f"homeassistant/sensor/{DEVICE_NAME}/command"
+
+READ_API_HOST = _settings['READ_API_HOST']
+READ_API_PORT = _settings['READ_API_PORT']
+READ_API_SOCKET = _settings['READ_API_SOCKET']
+
+# Settings that live in long-lived connections or listeners set up in main()
+RESTART_REQUIRED_SETTINGS = frozenset({
+    'MQTT_BROKER',
+    'MQTT_PORT',
+    'MQTT_USERNAME',
+    'MQTT_PASSWORD',
+    'DEVICE_NAME',
+    'MQTT_COMMANDS_ENABLED',
+    'READ_API_HOST',
+    'READ_API_PORT',
+    'READ_API_SOCKET',
+    'MODBUS_MIRROR_HOST',
+    'MODBUS_MIRROR_PORT',
+    'LOG_REPEAT_WINDOW_SECONDS',
+    'CONFIG_WATCH_INTERVAL_SECONDS',
+})
 
 API_URL = cast(str, API_URL)
 MQTT_BROKER = cast(str, MQTT_BROKER)
 
-if MODBUS_ENABLED and MODBUS_PUBLISH_INTERVAL_SECONDS < MODBUS_POLLING_INTERVAL_SECONDS:
-    raise ValueError(
-        "MODBUS_PUBLISH_INTERVAL_SECONDS must be >= MODBUS_POLLING_INTERVAL_SECONDS"
-    )
-
 # MQTT client setup
 client = mqtt_client.Client()
 client.username_pw_set(MQTT_USERNAME, MQTT_PASSWORD)
@@ -53,6 +178,8 @@ client.connect(MQTT_BROKER, MQTT_PORT)
 mqtt_lock = threading.Lock()
 api_data_lock = threading.Lock()
 session = None
+http_session: Optional[requests.Session] = None
+session_cookies_restored = False
 last_login_time = 0
 LOGIN_COOLDOWN = 60
 error_count = 0
@@ -61,6 +188,35 @@ latest_api_data: Optional[Dict[str, Any]] = None
 modbus_error_count = 0
 last_modbus_error = ''
 fallback_active = False
+last_published_power: Dict[str, float] = {}
+last_immediate_publish: Dict[str, float] = {}
+
+# API pipeline: fetch -> extract -> publish, joined by latest-wins slots
+raw_data_slot: LatestSlot[Measured] = LatestSlot()
+sensor_values_slot: LatestSlot[Measured] = LatestSlot()
+# Extract and publish stages of the running pipeline, for pipeline_stats()
+api_stages: List[Stage] = []
+latest_api_measured_at: Optional[float] = None
+
+# Set to stop the polling loops (used by the soak harness)
+stop_event = threading.Event()
+
+# Set by SIGHUP to reload .env; set by reload_config when the Modbus endpoint changed
+reload_requested = threading.Event()
+modbus_reconnect = threading.Event()
+
+# Runtime poll rates, adjustable through the command topic
+api_rate = RateController(INTERVAL_SECONDS)
+modbus_rate = RateController(MODBUS_POLLING_INTERVAL_SECONDS)
+
+# Latest values served to local readers by the read API
+snapshot_store = SnapshotStore()
+
+# Sample-to-publish latency per source, exposed through the read API
+latency_tracker = LatencyTracker()
+
+# Registers from the last Modbus poll, served to local clients by the mirror
+register_image = RegisterImage(list(ModbusPoller.REGISTER_MAP.values()), max_age=MODBUS_MIRROR_MAX_AGE_SECONDS)
 
 MODBUS_PRIMARY_SENSORS = {'varta_ac_port_power_w', 'grid_power_total_w'}
 
@@ -76,6 +232,7 @@ SENSORS = {
     'temperature_1_c': {'name': 'Temperature 1', 'unit': '°C', 'device_class': 'temperature', 'path': 'pulse.procImg', 'source_key': 'temperature1_C'},
 
     # Power
+    'pv_power_w': {'name': 'PV Power', 'unit': 'W', 'device_class': 'power', 'path': 'pulse.procImg', 'source_key': 'generatingPower_W'},
     'battery_power_w': {'name': 'Battery Power', 'unit': 'W', 'device_class': 'power', 'path': 'pulse.procImg', 'source_key': 'power_W'},
     'grid_power_total_w': {'name': 'Grid Power Total', 'unit': 'W', 'device_class': 'power', 'path': 'pulse.procImg', 'source_key': 'gridPower_W'},
     'varta_ac_port_power_w': {'name': 'Varta AC Port Active Power', 'unit': 'W', 'device_class': 'power', 'path': 'pulse.procImg', 'source_key': 'activePowerAc_W'},
@@ -161,6 +318,44 @@ SENSORS = {
     'min_cell_voltage_mv': {'name': 'Min Cell Voltage', 'unit': 'mV', 'device_class': 'voltage', 'path': 'pulse.bmAct', 'source_key': 'minCellVoltage_mV'},
 }
 
+# Sensors computed from other sensors once per snapshot. Expressions may use
+# SENSORS keys, other derived keys, arithmetic, comparisons, 'x if c else y'
+# and abs/min/max/round.
+DERIVED_SENSORS = {
+    'house_consumption_w': {
+        'name': 'House Consumption',
+        'unit': 'W',
+        'device_class': 'power',
+        'expression': 'max(0, pv_power_w + grid_power_total_w - varta_ac_port_power_w)',
+    },
+    'self_sufficiency_pct': {
+        'name': 'Self Sufficiency',
+        'unit': '%',
+        'device_class': None,
+        'expression': (
+            'round(max(0, 100 - 100 * max(grid_power_total_w, 0) / house_consumption_w), 1)'
+            ' if house_consumption_w > 0 else 100'
+        ),
+    },
+    'round_trip_efficiency_pct': {
+        'name': 'Round Trip Efficiency (AC)',
+        'unit': '%',
+        'device_class': None,
+        'expression': 'round(100 * battery_to_ac_discharged_total_wh / grid_to_battery_charged_total_wh, 1)',
+    },
+}
+
+derived_metrics = DerivedMetrics({key: config['expression'] for key, config in DERIVED_SENSORS.items()})
+
+_unknown_inputs = derived_metrics.inputs - set(SENSORS)
+if _unknown_inputs:
+    raise ValueError(f"Derived sensors reference unknown sensors: {', '.join(sorted(_unknown_inputs))}")
+
+
+def enabled_sensors() -> List[str]:
+    return [sensor_key for sensor_key in SENSORS if sensor_key not in DISABLED_SENSORS]
+
+
 # Status sensors for monitoring
 STATUS_SENSORS = {
     'service_status': {'name': 'Service Status', 'icon': 'mdi:heart-pulse'},
@@ -174,6 +369,7 @@ STATUS_SENSORS = {
     'fallback_active': {'name': 'Fallback Active', 'icon': 'mdi:swap-horizontal-bold'},
     'data_source_grid_power': {'name': 'Grid Power Data Source', 'icon': 'mdi:source-branch'},
     'data_source_battery_active_power': {'name': 'Battery Active Power Data Source', 'icon': 'mdi:source-branch'},
+    'last_command': {'name': 'Last Command', 'icon': 'mdi:console'},
 }
 
 
@@ -185,6 +381,7 @@ def safe_publish(topic: str, payload: str, retain: bool = False) -> None:
 def publish_status(sensor_key: str, value: Any) -> None:
     topic = f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/state"
     safe_publish(topic, str(value), retain=True)
+    snapshot_store.update_entries('status', {sensor_key: value})
 
 
 def extract_sensor_value(data: Dict[str, Any], sensor_key: str) -> float:
@@ -220,23 +417,38 @@ def extract_sensor_value(data: Dict[str, Any], sensor_key: str) -> float:
     return raw_value
 
 
+def publish_sensor_discovery(sensor_key: str) -> None:
+    config = SENSORS[sensor_key] if sensor_key in SENSORS else DERIVED_SENSORS[sensor_key]
+    topic = f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/config"
+    payload = {
+        'name': config['name'],
+        'state_topic': f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/state",
+        'json_attributes_topic': f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/attributes",
+        'unit_of_measurement': config['unit'],
+        'device_class': config['device_class'],
+        'device': {
+            'identifiers': [DEVICE_NAME],
+            'name': 'Varta Battery',
+            'manufacturer': 'Varta',
+            'model': 'Battery System',
+        },
+        'unique_id': f"{DEVICE_NAME}_{sensor_key}",
+    }
+    safe_publish(topic, json.dumps(payload), retain=True)
+
+
+def remove_sensor_discovery(sensor_key: str) -> None:
+    """Clear the retained discovery config so Home Assistant drops the entity."""
+    safe_publish(f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/config", '', retain=True)
+
+
 def publish_discovery() -> None:
-    for sensor_key, config in SENSORS.items():
-        topic = f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/config"
-        payload = {
-            'name': config['name'],
-            'state_topic': f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/state",
-            'unit_of_measurement': config['unit'],
-            'device_class': config['device_class'],
-            'device': {
-                'identifiers': [DEVICE_NAME],
-                'name': 'Varta Battery',
-                'manufacturer': 'Varta',
-                'model': 'Battery System',
-            },
-            'unique_id': f"{DEVICE_NAME}_{sensor_key}",
-        }
-        safe_publish(topic, json.dumps(payload), retain=True)
+    for sensor_key in enabled_sensors():
+        publish_sensor_discovery(sensor_key)
+
+    for sensor_key in DERIVED_SENSORS:
+        if sensor_key not in DISABLED_SENSORS:
+            publish_sensor_discovery(sensor_key)
 
     for sensor_key, config in STATUS_SENSORS.items():
         topic = f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/config"
@@ -255,12 +467,94 @@ def publish_discovery() -> None:
         safe_publish(topic, json.dumps(payload), retain=True)
 
 
+def _new_http_session() -> requests.Session:
+    http = requests.Session()
+    # The battery is a single host polled from one thread: keep exactly one
+    # keep-alive connection and let the loops handle retries.
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+    http.mount('http://', adapter)
+    http.mount('https://', adapter)
+    return http
+
+
+def _save_session_cookies(http: requests.Session) -> None:
+    if not SESSION_COOKIE_FILE:
+        return
+
+    cookies = [
+        {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'expires': c.expires}
+        for c in http.cookies
+    ]
+    tmp_path = f"{SESSION_COOKIE_FILE}.tmp"
+    try:
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as fh:
+            json.dump(cookies, fh)
+        os.replace(tmp_path, SESSION_COOKIE_FILE)
+    except OSError as exc:
+        logger.warning("Could not save session cookies to %s: %s", SESSION_COOKIE_FILE, exc)
+
+
+def _is_valid_cookie(cookie: Any) -> bool:
+    return (
+        isinstance(cookie, dict)
+        and isinstance(cookie.get('name'), str)
+        and isinstance(cookie.get('value'), str)
+        and isinstance(cookie.get('domain', ''), str)
+        and isinstance(cookie.get('path', '/'), str)
+        and (cookie.get('expires') is None or type(cookie['expires']) in (int, float))
+    )
+
+
+def _restore_session_cookies(http: requests.Session) -> bool:
+    if not SESSION_COOKIE_FILE or not os.path.exists(SESSION_COOKIE_FILE):
+        return False
+
+    try:
+        with open(SESSION_COOKIE_FILE, encoding='utf-8') as fh:
+            cookies = json.load(fh)
+        if not isinstance(cookies, list) or not all(_is_valid_cookie(cookie) for cookie in cookies):
+            raise ValueError("expected a list of cookies with name and value")
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable session cookie file %s: %s", SESSION_COOKIE_FILE, exc)
+        return False
+
+    now = time.time()
+    restored = 0
+    for cookie in cookies:
+        if cookie.get('expires') and cookie['expires'] <= now:
+            continue
+        http.cookies.set(
+            cookie['name'],
+            cookie['value'],
+            domain=cookie.get('domain', ''),
+            path=cookie.get('path', '/'),
+            expires=cookie.get('expires'),
+        )
+        restored += 1
+
+    if restored:
+        logger.info("Restored %d session cookie(s) from %s", restored, SESSION_COOKIE_FILE)
+    return restored > 0
+
+
+def _get_http_session() -> requests.Session:
+    """Return the pooled session, creating it (and restoring cookies) once."""
+    global http_session, session_cookies_restored
+
+    if http_session is None:
+        http_session = _new_http_session()
+        session_cookies_restored = _restore_session_cookies(http_session)
+    return http_session
+
+
 def perform_login() -> bool:
     global session, last_login_time, error_count, last_error
 
     current_time = time.time()
     if current_time - last_login_time < LOGIN_COOLDOWN:
-        print(f"Login cooldown active. Next login possible in {LOGIN_COOLDOWN - (current_time - last_login_time):.0f}s")
+        # Constant text so the repeat filter collapses it during an outage
+        logger.warning("Login cooldown active, skipping login")
+        logger.debug("Next login possible in %.0fs", LOGIN_COOLDOWN - (current_time - last_login_time))
         publish_status('login_status', 'cooldown')
         return False
 
@@ -269,19 +563,23 @@ def perform_login() -> bool:
             publish_status('login_status', 'disabled')
             return False
 
-        session = requests.Session()
+        # Re-login on the pooled session so its keep-alive connection survives
+        http = _get_http_session()
+        http.cookies.clear()
         login_data = {'username': API_USERNAME, 'password': API_PASSWORD}
-        login_response = session.post(LOGIN_URL, data=login_data, timeout=10)
+        login_response = http.post(LOGIN_URL, data=login_data, timeout=10)
 
         if login_response.status_code == 200:
+            session = http
             last_login_time = current_time
-            print(f"Login successful at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            _save_session_cookies(http)
+            logger.info("Login successful")
             publish_status('login_status', 'success')
             publish_status('service_status', 'online')
             return True
 
         error_msg = f"Login failed: {login_response.status_code}"
-        print(error_msg)
+        logger.error(error_msg)
         last_error = error_msg
         error_count += 1
         publish_status('login_status', 'failed')
@@ -291,7 +589,7 @@ def perform_login() -> bool:
         return False
     except requests.RequestException as exc:
         error_msg = f"Login error: {exc}"
-        print(error_msg)
+        logger.error(error_msg)
         last_error = error_msg
         error_count += 1
         publish_status('login_status', 'error')
@@ -303,21 +601,26 @@ def perform_login() -> bool:
 
 
 def fetch_data() -> Optional[Dict[str, Any]]:
-    global session, error_count, last_error
+    global session, session_cookies_restored, error_count, last_error
     api_url = API_URL or ''
 
     if session is None:
-        if LOGIN_URL and API_USERNAME and API_PASSWORD:
+        http = _get_http_session()
+        if session_cookies_restored:
+            # Try the persisted login first; a 401/403 below falls back to login
+            session_cookies_restored = False
+            session = http
+        elif LOGIN_URL and API_USERNAME and API_PASSWORD:
             if not perform_login():
                 return None
         else:
-            session = requests.Session()
+            session = http
 
     try:
         assert session is not None
         response = session.get(api_url, timeout=10)
         if response.status_code in [401, 403]:
-            print('Session expired, attempting re-login...')
+            logger.warning("Session expired, attempting re-login...")
             publish_status('login_status', 'expired')
             if LOGIN_URL and API_USERNAME and API_PASSWORD:
                 if perform_login():
@@ -329,13 +632,10 @@ def fetch_data() -> Optional[Dict[str, Any]]:
                 return None
 
         response.raise_for_status()
-        data = response.json()
-        publish_status('service_status', 'online')
-        publish_status('last_update', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        return data
-    except requests.RequestException as exc:
+        return response.json()
+    except (requests.RequestException, ValueError) as exc:
         error_msg = f"API fetch error: {exc}"
-        print(error_msg)
+        logger.error(error_msg)
         last_error = error_msg
         error_count += 1
         publish_status('service_status', 'error')
@@ -344,19 +644,125 @@ def fetch_data() -> Optional[Dict[str, Any]]:
         return None
 
 
-def publish_data(data: Dict[str, Any]) -> None:
-    for sensor_key in SENSORS:
+def extract_sensor_values(data: Dict[str, Any]) -> Dict[str, float]:
+    values: Dict[str, float] = {}
+    for sensor_key in enabled_sensors():
         if MODBUS_ENABLED and sensor_key in MODBUS_PRIMARY_SENSORS:
             continue
+        values[sensor_key] = extract_sensor_value(data, sensor_key)
+    return values
+
+
+def _publish_attributes(
+    sensor_key: str,
+    measured_at: float,
+    published_at: float,
+    source: str,
+    sample_count: int = 1,
+    window_seconds: float = 0.0,
+) -> None:
+    attributes = {
+        'measured_at': datetime.fromtimestamp(measured_at).astimezone().isoformat(timespec='milliseconds'),
+        'latency_ms': round(max(0.0, published_at - measured_at) * 1000, 1),
+        'source': source,
+        'sample_count': sample_count,
+        'window_seconds': round(window_seconds, 3),
+    }
+    topic = f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/attributes"
+    safe_publish(topic, json.dumps(attributes))
+
+
+def _publish_derived_values(values: Dict[str, float], measured_at: Optional[float] = None) -> None:
+    """Feed a snapshot to the derived-metrics engine and publish what it recomputed.
+
+    Disabled sensors are not passed on, so outputs built on them stop
+    updating instead of being computed from a frozen value.
+    """
+    inputs = {sensor_key: value for sensor_key, value in values.items() if sensor_key not in DISABLED_SENSORS}
+    derived = {
+        sensor_key: value
+        for sensor_key, value in derived_metrics.update(inputs).items()
+        if sensor_key not in DISABLED_SENSORS
+    }
+    if not derived:
+        return
+
+    published_at = time.time()
+    if measured_at is None:
+        measured_at = published_at
+
+    for sensor_key, value in derived.items():
+        safe_publish(f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/state", str(value))
+        _publish_attributes(sensor_key, measured_at, published_at, source='derived')
+    snapshot_store.update_entries('sensors', derived, updated_at=measured_at, source='derived')
+
+
+def _publish_latency_stats() -> None:
+    stats: Dict[str, Any] = {source: latency_tracker.summary(source) for source in latency_tracker.sources()}
+    if api_stages:
+        stats['pipeline'] = pipeline_stats()
+    snapshot_store.update_entries('latency', stats)
+
+
+def pipeline_stats() -> Dict[str, Dict[str, Any]]:
+    """Per API stage: runs, duration of the last run, and snapshots replaced before the stage took them."""
+    return {
+        stage.name: {
+            'cycles': stage.cycles,
+            'last_duration_ms': round(stage.last_duration * 1000, 1),
+            'dropped': stage.inbox.dropped,
+        }
+        for stage in api_stages
+    }
+
+
+def publish_sensor_values(values: Dict[str, float], measured_at: Optional[float] = None) -> None:
+    published_at = time.time()
+    if measured_at is None:
+        measured_at = published_at
 
-        value = extract_sensor_value(data, sensor_key)
+    for sensor_key, value in values.items():
         topic = f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/state"
         safe_publish(topic, str(value))
+        _publish_attributes(sensor_key, measured_at, published_at, source='api')
+
+    _publish_derived_values(values, measured_at)
+    latency_tracker.record('api', published_at - measured_at)
+    _publish_latency_stats()
+
+
+def publish_data(data: Dict[str, Any], measured_at: Optional[float] = None) -> None:
+    publish_sensor_values(extract_sensor_values(data), measured_at=measured_at)
+
 
+def _publish_power_value(
+    sensor_key: str,
+    value: float,
+    sample_count: int = 1,
+    source: str = 'modbus',
+    measured_at: Optional[float] = None,
+    window_seconds: float = 0.0,
+) -> None:
+    if sensor_key in DISABLED_SENSORS:
+        return
+
+    published_at = time.time()
+    if measured_at is None:
+        measured_at = published_at
 
-def _publish_power_value(sensor_key: str, value: float) -> None:
     topic = f"homeassistant/sensor/{DEVICE_NAME}/{sensor_key}/state"
     safe_publish(topic, str(value))
+    _publish_attributes(sensor_key, measured_at, published_at, source, sample_count, window_seconds)
+    last_published_power[sensor_key] = value
+    snapshot_store.update_entries(
+        'modbus',
+        {sensor_key: value},
+        updated_at=measured_at,
+        sample_count=sample_count,
+        source=source,
+        window_seconds=window_seconds,
+    )
+    latency_tracker.record(source, published_at - measured_at)
 
 
 def _publish_modbus_source_status(use_fallback: bool) -> None:
@@ -376,6 +782,7 @@ def _publish_modbus_source_status(use_fallback: bool) -> None:
 
 
 def _get_api_fallback_values() -> Dict[str, float]:
+    """Primary power values from the last API response (see latest_api_measured_at)."""
     with api_data_lock:
         if latest_api_data is None:
             return {}
@@ -385,8 +792,17 @@ def _get_api_fallback_values() -> Dict[str, float]:
         }
 
 
-def _publish_averaged_modbus_values(samples: Dict[str, list]) -> bool:
-    published_any = False
+def _publish_averaged_modbus_values(
+    samples: Dict[str, list],
+    windows: Optional[Dict[str, List[float]]] = None,
+) -> bool:
+    """Publish the mean of each sensor's samples.
+
+    ``windows`` maps a sensor to the [first, last] measured-at times of its
+    samples; the average is stamped with the newest one.
+    """
+    averages: Dict[str, float] = {}
+    newest: Optional[float] = None
 
     for sensor_key in MODBUS_PRIMARY_SENSORS:
         sensor_samples = samples.get(sensor_key, [])
@@ -394,88 +810,414 @@ def _publish_averaged_modbus_values(samples: Dict[str, list]) -> bool:
             continue
 
         avg_value = sum(sensor_samples) / len(sensor_samples)
-        _publish_power_value(sensor_key, avg_value)
-        published_any = True
+        window = (windows or {}).get(sensor_key)
+        _publish_power_value(
+            sensor_key,
+            avg_value,
+            sample_count=len(sensor_samples),
+            measured_at=window[1] if window else None,
+            window_seconds=window[1] - window[0] if window else 0.0,
+        )
+        averages[sensor_key] = avg_value
+        if window:
+            newest = window[1] if newest is None else max(newest, window[1])
+
+    if averages:
+        _publish_derived_values(averages, newest)
+    return bool(averages)
+
+
+def _publish_immediate_power_changes(
+    values: Dict[str, int],
+    now: float,
+    measured_at: Optional[float] = None,
+) -> Set[str]:
+    """Publish samples that moved more than the threshold since the last publish."""
+    published: Set[str] = set()
+    if MODBUS_IMMEDIATE_THRESHOLD_W <= 0:
+        return published
+
+    for sensor_key, value in values.items():
+        if sensor_key not in MODBUS_PRIMARY_SENSORS:
+            continue
 
-    return published_any
+        last_value = last_published_power.get(sensor_key)
+        if last_value is None or abs(value - last_value) <= MODBUS_IMMEDIATE_THRESHOLD_W:
+            continue
 
+        last_sent = last_immediate_publish.get(sensor_key)
+        if last_sent is not None and now - last_sent < MODBUS_IMMEDIATE_MIN_GAP_SECONDS:
+            continue
 
-def run_modbus_loop() -> None:
-    global modbus_error_count, last_modbus_error, fallback_active
+        _publish_power_value(sensor_key, value, measured_at=measured_at)
+        last_immediate_publish[sensor_key] = now
+        published.add(sensor_key)
+
+    if published:
+        _publish_derived_values({sensor_key: values[sensor_key] for sensor_key in published}, measured_at)
+    return published
 
+
+def _new_modbus_poller() -> ModbusPoller:
     assert MODBUS_HOST is not None
-    poller = ModbusPoller(
+    return ModbusPoller(
         host=MODBUS_HOST,
         port=MODBUS_PORT,
         unit_id=MODBUS_UNIT_ID,
         timeout=MODBUS_TIMEOUT_SECONDS,
+        clock=time,
     )
 
+
+def run_modbus_loop() -> None:
+    global modbus_error_count, last_modbus_error, fallback_active
+
+    poller = _new_modbus_poller()
+
     samples = {key: [] for key in MODBUS_PRIMARY_SENSORS}
-    next_publish = time.monotonic() + MODBUS_PUBLISH_INTERVAL_SECONDS
+    windows: Dict[str, List[float]] = {}
+    last_publish = time.monotonic()
+
+    while not stop_event.is_set():
+        if modbus_reconnect.is_set():
+            # Endpoint changed on reload; the averaging window carries over
+            modbus_reconnect.clear()
+            poller.close()
+            poller = _new_modbus_poller()
+            logger.info("Modbus reconnecting to %s:%s (unit_id=%s)", MODBUS_HOST, MODBUS_PORT, MODBUS_UNIT_ID)
+
+        if modbus_rate.is_paused():
+            modbus_rate.wait_while_paused()
+            continue
 
-    while True:
+        values: Dict[str, int] = {}
+        measured_at: Optional[float] = None
         try:
             values = poller.poll_values()
+            measured_at = poller.last_polled_at
+            register_image.update({poller.REGISTER_MAP[key]: value for key, value in values.items()})
             for sensor_key, value in values.items():
                 if sensor_key in samples:
                     samples[sensor_key].append(value)
+                    window = windows.setdefault(sensor_key, [measured_at, measured_at])
+                    window[1] = measured_at
         except Exception as exc:  # pylint: disable=broad-except
             modbus_error_count += 1
             last_modbus_error = str(exc)
+            logger.warning("Modbus poll error: %s", exc)
 
         now = time.monotonic()
-        if now >= next_publish:
-            published_modbus = _publish_averaged_modbus_values(samples)
+        for sensor_key in _publish_immediate_power_changes(values, now, measured_at):
+            # Restart the averaging window so the next mean reflects the new level
+            samples[sensor_key] = [values[sensor_key]]
+            windows[sensor_key] = [measured_at, measured_at]
+
+        # A boost shortens the publish window too, so the faster polls reach MQTT
+        publish_interval = modbus_rate.boosted_interval() or MODBUS_PUBLISH_INTERVAL_SECONDS
+        if now - last_publish >= publish_interval:
+            published_modbus = _publish_averaged_modbus_values(samples, windows)
             use_fallback = not published_modbus
 
             if use_fallback:
                 fallback_values = _get_api_fallback_values()
                 if fallback_values:
                     for sensor_key, value in fallback_values.items():
-                        _publish_power_value(sensor_key, value)
+                        _publish_power_value(sensor_key, value, source='api', measured_at=latest_api_measured_at)
+                    _publish_derived_values(fallback_values, latest_api_measured_at)
                 fallback_active = True
             else:
                 fallback_active = False
 
             _publish_modbus_source_status(use_fallback=fallback_active)
+            _publish_latency_stats()
             samples = {key: [] for key in MODBUS_PRIMARY_SENSORS}
-            next_publish = now + MODBUS_PUBLISH_INTERVAL_SECONDS
+            windows = {}
+            last_publish = now
 
-        time.sleep(MODBUS_POLLING_INTERVAL_SECONDS)
+        modbus_rate.sleep(modbus_rate.interval())
 
+    poller.close()
 
-def run_api_loop() -> None:
-    global latest_api_data
 
-    while True:
+def _extract_stage(item: Measured) -> Measured:
+    global latest_api_data, latest_api_measured_at
+
+    data, measured_at = item
+    with api_data_lock:
+        latest_api_data = data
+        latest_api_measured_at = measured_at
+    values = extract_sensor_values(data)
+    snapshot_store.set_raw(data)
+    snapshot_store.update_entries('sensors', values, updated_at=measured_at)
+    return Measured(values, measured_at)
+
+
+def _publish_stage(item: Measured) -> None:
+    publish_sensor_values(item.payload, measured_at=item.measured_at)
+    # Published here rather than on fetch so a slow broker never delays the next fetch
+    publish_status('service_status', 'online')
+    publish_status('last_update', datetime.fromtimestamp(item.measured_at).strftime('%Y-%m-%d %H:%M:%S'))
+
+
+def run_fetch_stage() -> None:
+    """Fetch on a fixed cadence; downstream stages never delay the next fetch."""
+    while not stop_event.is_set():
+        refresh_requested = api_rate.consume_refresh()
+        if api_rate.is_paused() and not refresh_requested:
+            api_rate.wait_while_paused()
+            continue
+
+        started = time.monotonic()
+        # The battery samples while serving the request; stamp it as it goes out
+        measured_at = time.time()
         data = fetch_data()
-        if data:
-            with api_data_lock:
-                latest_api_data = data
-            publish_data(data)
-        else:
+        if not data:
             wait_time = min(INTERVAL_SECONDS * (2 ** min(error_count, 5)), 60)
-            print(f"Error occurred. Waiting {wait_time}s before retry... (Error #{error_count})")
-            time.sleep(wait_time)
+            logger.debug("Error occurred. Waiting %ss before retry... (Error #%d)", wait_time, error_count)
+            api_rate.sleep(wait_time)
             continue
 
-        time.sleep(INTERVAL_SECONDS)
+        raw_data_slot.put(Measured(data, measured_at))
+        elapsed = time.monotonic() - started
+        api_rate.sleep(max(0.0, api_rate.interval() - elapsed))
+
+
+def run_api_loop() -> None:
+    global api_stages
+
+    api_stages = [
+        Stage('api-extract', _extract_stage, inbox=raw_data_slot, outbox=sensor_values_slot),
+        Stage('api-publish', _publish_stage, inbox=sensor_values_slot),
+    ]
+    for stage in api_stages:
+        stage.start()
+
+    try:
+        run_fetch_stage()
+    finally:
+        for stage in api_stages:
+            stage.stop()
+
+
+def _command_rates(target: str) -> Dict[str, RateController]:
+    rates = {'api': api_rate, 'modbus': modbus_rate}
+    if target == 'all':
+        return rates
+    return {target: rates[target]}
+
+
+def handle_command(payload: bytes) -> None:
+    try:
+        command = parse_command(payload)
+    except ValueError as exc:
+        logger.warning("Ignoring command: %s", exc)
+        publish_status('last_command', f"rejected: {exc}")
+        return
+
+    name = command['command']
+    duration = command['minutes'] * 60
+    if name == 'refresh':
+        api_rate.request_refresh()
+        summary = 'refresh'
+    elif name == 'boost':
+        for rate in _command_rates(command['target']).values():
+            rate.boost(command['interval'], duration)
+        summary = f"boost {command['target']} to {command['interval']:g}s for {command['minutes']:g}min"
+    elif name == 'pause':
+        for rate in _command_rates(command['target']).values():
+            rate.pause(duration)
+        summary = f"pause {command['target']} for {command['minutes']:g}min"
+    else:
+        for rate in _command_rates(command['target']).values():
+            rate.resume()
+        summary = f"resume {command['target']}"
+
+    logger.info("Command: %s", summary)
+    publish_status('last_command', summary)
+
+
+def _on_mqtt_connect(mqtt: Any, userdata: Any, flags: Any, rc: int) -> None:
+    if rc == 0:
+        mqtt.subscribe(COMMAND_TOPIC)
+
+
+def _on_mqtt_message(mqtt: Any, userdata: Any, message: Any) -> None:
+    if message.retain:
+        # A retained command would be replayed on every reconnect and restart
+        logger.warning("Ignoring retained command on %s", message.topic)
+        return
+    handle_command(message.payload)
+
+
+def _apply_sensor_changes(previously_disabled: FrozenSet[str]) -> None:
+    known = set(SENSORS) | set(DERIVED_SENSORS)
+    unknown = DISABLED_SENSORS - known
+    if unknown:
+        logger.warning("Unknown sensors in DISABLED_SENSORS: %s", ', '.join(sorted(unknown)))
+
+    for sensor_key in sorted((DISABLED_SENSORS - previously_disabled) & known):
+        remove_sensor_discovery(sensor_key)
+    for sensor_key in sorted((previously_disabled - DISABLED_SENSORS) & known):
+        publish_sensor_discovery(sensor_key)
+
+    stale_derived = derived_metrics.forget(DISABLED_SENSORS)
+    snapshot_store.remove_entries('sensors', DISABLED_SENSORS | stale_derived)
+    snapshot_store.remove_entries('modbus', DISABLED_SENSORS)
+
+
+def reload_config() -> Set[str]:
+    """Re-read .env and apply only what changed. Returns the applied setting names.
+
+    Poll intervals, thresholds, API credentials, the Modbus endpoint and the
+    sensor set take effect in place; the MQTT connection, discovery for
+    unchanged sensors, the API session and averaging windows are kept.
+    """
+    global session, session_cookies_restored, last_login_time
+
+    # Layer .env under the startup environment without touching os.environ, so
+    # keys removed from .env fall back to their defaults
+    dotenv_settings = {
+        key: value for key, value in (dotenv_values(ENV_FILE) if ENV_FILE else {}).items() if value is not None
+    }
+    try:
+        settings = read_settings({**dotenv_settings, **PROCESS_ENVIRON})
+    except ValueError as exc:
+        logger.error("Config reload rejected: %s", exc)
+        return set()
+
+    module_globals = globals()
+    changed = {name for name, value in settings.items() if module_globals[name] != value}
+    restart_required = changed & RESTART_REQUIRED_SETTINGS
+    if bool(settings['MODBUS_HOST']) != MODBUS_ENABLED:
+        # The Modbus thread and the API/Modbus sensor split are set up at startup
+        restart_required.add('MODBUS_HOST')
+    if restart_required:
+        logger.warning("Restart required to apply: %s", ', '.join(sorted(restart_required)))
+
+    applied = changed - restart_required
+    if not applied:
+        return applied
+
+    previously_disabled = DISABLED_SENSORS
+    module_globals.update({name: settings[name] for name in applied})
+
+    if 'INTERVAL_SECONDS' in applied:
+        api_rate.set_baseline(INTERVAL_SECONDS)
+    if 'MODBUS_POLLING_INTERVAL_SECONDS' in applied:
+        modbus_rate.set_baseline(MODBUS_POLLING_INTERVAL_SECONDS)
+    if applied & {'MODBUS_HOST', 'MODBUS_PORT', 'MODBUS_UNIT_ID', 'MODBUS_TIMEOUT_SECONDS'}:
+        modbus_reconnect.set()
+    if applied & {'LOGIN_URL', 'API_USERNAME', 'API_PASSWORD'}:
+        # Log in again with the new credentials on the next fetch
+        session = None
+        session_cookies_restored = False
+        last_login_time = 0
+    if 'MODBUS_MIRROR_MAX_AGE_SECONDS' in applied:
+        register_image.max_age = MODBUS_MIRROR_MAX_AGE_SECONDS
+    if 'LOG_LEVEL' in applied:
+        logging.getLogger().setLevel(LOG_LEVEL.upper())
+    if 'DISABLED_SENSORS' in applied:
+        _apply_sensor_changes(previously_disabled)
+
+    logger.info("Config reloaded: %s", ', '.join(sorted(applied)))
+    return applied
+
+
+def _env_file_mtime() -> Optional[float]:
+    try:
+        return os.stat(ENV_FILE).st_mtime if ENV_FILE else None
+    except OSError:
+        return None
+
+
+def run_config_watcher() -> None:
+    """Reload on SIGHUP and, with CONFIG_WATCH_INTERVAL_SECONDS set, when .env changes."""
+    last_mtime = _env_file_mtime()
+    while not stop_event.is_set():
+        requested = reload_requested.wait(timeout=CONFIG_WATCH_INTERVAL_SECONDS or None)
+        reload_requested.clear()
+
+        mtime = _env_file_mtime()
+        if not requested and mtime == last_mtime:
+            continue
+        last_mtime = mtime
+
+        try:
+            reload_config()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Config reload failed")
+
+
+def health() -> Dict[str, Any]:
+    """Compact health summary, reported upstream by supervisor workers."""
+    return {
+        'device': DEVICE_NAME,
+        'logged_in': session is not None,
+        'error_count': error_count,
+        'last_error': last_error,
+        'modbus_error_count': modbus_error_count,
+        'fallback_active': fallback_active,
+        'last_measured_at': latest_api_measured_at,
+        'pipeline': pipeline_stats(),
+    }
 
 
 def main() -> None:
-    print('=' * 60)
-    print(f"Varta MQTT Service started at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"API: {API_URL}")
-    print(f"MQTT Broker: {MQTT_BROKER}:{MQTT_PORT}")
-    print(f"API Update Interval: {INTERVAL_SECONDS}s")
+    configure_logging(LOG_LEVEL, repeat_window=LOG_REPEAT_WINDOW_SECONDS)
+    run_service()
+
+
+def run_service() -> None:
+    """Start listeners and background loops, then run the API loop until stopped.
+
+    Reload on SIGHUP and .env watching are only set up when running in the
+    main thread; supervisor workers run several instances per process that
+    all share one environment.
+    """
+    logger.info('=' * 60)
+    logger.info("Varta MQTT Service started")
+    logger.info("API: %s", API_URL)
+    logger.info("MQTT Broker: %s:%s", MQTT_BROKER, MQTT_PORT)
+    logger.info("API Update Interval: %ss", INTERVAL_SECONDS)
     if MODBUS_ENABLED:
-        print(f"Modbus: {MODBUS_HOST}:{MODBUS_PORT} (unit_id={MODBUS_UNIT_ID})")
-        print(f"Modbus Polling Interval: {MODBUS_POLLING_INTERVAL_SECONDS}s")
-        print(f"Modbus Publish Interval: {MODBUS_PUBLISH_INTERVAL_SECONDS}s")
+        logger.info("Modbus: %s:%s (unit_id=%s)", MODBUS_HOST, MODBUS_PORT, MODBUS_UNIT_ID)
+        logger.info("Modbus Polling Interval: %ss", MODBUS_POLLING_INTERVAL_SECONDS)
+        logger.info("Modbus Publish Interval: %ss", MODBUS_PUBLISH_INTERVAL_SECONDS)
+        if MODBUS_IMMEDIATE_THRESHOLD_W > 0:
+            logger.info(
+                "Modbus Immediate Publish: >%gW change, min gap %gs",
+                MODBUS_IMMEDIATE_THRESHOLD_W,
+                MODBUS_IMMEDIATE_MIN_GAP_SECONDS,
+            )
     else:
-        print('Modbus disabled (set MODBUS_HOST to enable)')
-    print('=' * 60)
+        logger.info("Modbus disabled (set MODBUS_HOST to enable)")
+    if MODBUS_MIRROR_PORT:
+        if MODBUS_ENABLED:
+            logger.info("Modbus Mirror: %s:%s (max age %gs)", MODBUS_MIRROR_HOST, MODBUS_MIRROR_PORT, MODBUS_MIRROR_MAX_AGE_SECONDS)
+        else:
+            logger.warning("MODBUS_MIRROR_PORT is set but Modbus is disabled; the mirror is not started")
+    if READ_API_PORT:
+        logger.info("Read API: http://%s:%s/", READ_API_HOST, READ_API_PORT)
+    if READ_API_SOCKET:
+        logger.info("Read API socket: %s", READ_API_SOCKET)
+    if MQTT_COMMANDS_ENABLED:
+        logger.info("Command Topic: %s", COMMAND_TOPIC)
+    if CONFIG_WATCH_INTERVAL_SECONDS > 0:
+        logger.info("Config Watch: %s every %gs", ENV_FILE or '.env (not found)', CONFIG_WATCH_INTERVAL_SECONDS)
+    logger.info('=' * 60)
+
+    if MQTT_COMMANDS_ENABLED:
+        client.on_connect = _on_mqtt_connect
+        client.on_message = _on_mqtt_message
+        client.loop_start()
+
+    if READ_API_PORT or READ_API_SOCKET:
+        start_read_api(
+            snapshot_store,
+            host=READ_API_HOST,
+            port=READ_API_PORT or None,
+            socket_path=READ_API_SOCKET,
+        )
 
     publish_discovery()
     publish_status('service_status', 'starting')
@@ -483,10 +1225,18 @@ def main() -> None:
     publish_status('modbus_error_count', '0')
     publish_status('fallback_active', 'false')
 
+    if MODBUS_ENABLED and MODBUS_MIRROR_PORT:
+        start_modbus_mirror(register_image, host=MODBUS_MIRROR_HOST, port=MODBUS_MIRROR_PORT)
+
     if MODBUS_ENABLED:
         modbus_thread = threading.Thread(target=run_modbus_loop, daemon=True, name='modbus-loop')
         modbus_thread.start()
 
+    if threading.current_thread() is threading.main_thread():
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: reload_requested.set())
+        threading.Thread(target=run_config_watcher, daemon=True, name='config-watcher').start()
+
     run_api_loop()
 
 
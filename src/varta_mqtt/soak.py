@@ -0,0 +1,466 @@
+"""Long-run soak harness for the polling loops.
+
+Drives ``run_api_loop`` and ``run_modbus_loop`` against local fake Varta
+HTTP and Modbus endpoints under a virtual clock, so days of operation run
+in minutes, and fails when memory, object counts or per-cycle latency
+regress past the configured limits.
+
+Usage::
+
+    python -m varta_mqtt.soak --days 7
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+from varta_mqtt.clock import VirtualClock
+from varta_mqtt.latency import percentile
+from varta_mqtt.modbus_mirror import (
+    READ_FUNCTION_CODES,
+    SERVER_DEVICE_FAILURE,
+    ModbusTcpServer,
+    RegisterImage,
+    exception_response,
+)
+
+
+DEFAULT_LIMITS = {
+    'max_rss_growth_mb': 20.0,
+    'max_object_growth': 5000,
+    'max_live_sessions': 2,
+    'max_cycle_latency_ms': 500.0,
+    'max_error_length': 1000,
+}
+
+# Participant threads of the virtual clock: API loop, Modbus loop, sampler
+SOAK_PARTICIPANTS = 3
+
+
+class FakeVartaServer:
+    """Local stand-in for the battery web interface (login.js, ems_data.js).
+
+    Sessions expire after ``session_ttl`` virtual seconds and every
+    ``fault_every``-th data request fails with a 500, so the re-login and
+    error paths run throughout a soak.
+    """
+
+    def __init__(self, clock: VirtualClock, sensors: Dict[str, Dict[str, Any]],
+                 session_ttl: float = 6 * 3600, fault_every: int = 97) -> None:
+        self.clock = clock
+        self.sensors = sensors
+        self.session_ttl = session_ttl
+        self.fault_every = fault_every
+        self.sessions: Dict[str, float] = {}
+        self.requests = 0
+        self.logins = 0
+        self._lock = threading.Lock()
+
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                token = fake.login()
+                self._reply(200, b'{}', {'Set-Cookie': f'session={token}; Path=/'})
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                cookie = self.headers.get('Cookie', '')
+                token = cookie.split('session=', 1)[1].split(';', 1)[0] if 'session=' in cookie else ''
+                status, body = fake.data(token)
+                self._reply(status, body)
+
+            def _reply(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def login(self) -> str:
+        token = uuid.uuid4().hex
+        with self._lock:
+            now = self.clock.monotonic()
+            self.sessions = {t: s for t, s in self.sessions.items() if now - s < self.session_ttl}
+            self.sessions[token] = now
+            self.logins += 1
+        return token
+
+    def data(self, token: str) -> tuple:
+        with self._lock:
+            self.requests += 1
+            started = self.sessions.get(token)
+            if started is None or self.clock.monotonic() - started >= self.session_ttl:
+                return 401, b'{}'
+            if self.fault_every and self.requests % self.fault_every == 0:
+                return 500, b'{}'
+        return 200, build_payload(self.sensors, self.clock.monotonic())
+
+    def start(self) -> None:
+        threading.Thread(target=self.server.serve_forever, daemon=True, name='fake-varta').start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def build_payload(sensors: Dict[str, Dict[str, Any]], now: float) -> bytes:
+    """ems_data.js-shaped payload with every configured key plus module bulk."""
+    proc_img: Dict[str, Any] = {'counters': {}}
+    bm_act: Dict[str, Any] = {}
+    for index, config in enumerate(sensors.values()):
+        value = int(1000 * math.sin(now / 600 + index)) + 1000 + int(now)
+        path = config.get('path', 'pulse.procImg')
+        if path == 'counters':
+            proc_img['counters'][config['source_key']] = value
+        elif path == 'pulse.bmAct':
+            bm_act[config['source_key']] = value
+        else:
+            proc_img[config['source_key']] = value
+
+    modules = [
+        {'serial': f"M{module:04d}", 'cellVoltages_mV': [3300 + (cell + int(now)) % 50 for cell in range(14)]}
+        for module in range(6)
+    ]
+    return json.dumps({'pulse': {'procImg': proc_img, 'bmAct': bm_act, 'modules': modules}}).encode('utf-8')
+
+
+class FakeModbusServer:
+    """Modbus TCP endpoint for function codes 3 and 4 with synthetic values.
+
+    Built on the mirror server: every request refreshes the register image
+    from the virtual clock before it is answered. Every ``fault_every``-th
+    request gets a server-device-failure exception.
+    """
+
+    def __init__(self, clock: VirtualClock, addresses: List[int], fault_every: int = 89) -> None:
+        self.clock = clock
+        self.addresses = list(addresses)
+        self.fault_every = fault_every
+        self.requests = 0
+        self.image = RegisterImage(self.addresses, clock=clock)
+        self.server = ModbusTcpServer(self.respond, port=0)
+
+    @property
+    def port(self) -> int:
+        return self.server.port
+
+    def respond(self, pdu: bytes) -> bytes:
+        function_code = pdu[0]
+        self.requests += 1
+        if function_code in READ_FUNCTION_CODES and self.fault_every and self.requests % self.fault_every == 0:
+            return exception_response(function_code, SERVER_DEVICE_FAILURE)
+
+        now = self.clock.monotonic()
+        self.image.update({address: int(3000 * math.sin(now / 300 + address)) for address in self.addresses})
+        return self.image.respond(pdu)
+
+    def start(self) -> None:
+        self.server.start(name='fake-modbus')
+
+    def stop(self) -> None:
+        self.server.stop()
+
+
+class PublishCounter:
+    """Drop-in for the MQTT client that only counts messages."""
+
+    def __init__(self) -> None:
+        self.messages = 0
+        self.bytes = 0
+
+    def publish(self, topic: str, payload: str, retain: bool = False) -> None:
+        self.messages += 1
+        self.bytes += len(payload)
+
+
+class LatencyWindow:
+    """Per-cycle latencies collected between two samples."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._values.setdefault(name, []).append(seconds)
+
+    def drain(self) -> Dict[str, List[float]]:
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def timed(self, name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+
+        return wrapper
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open('/proc/self/statm', encoding='ascii') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        # No /proc (or os.sysconf on Windows). Peak rather than current RSS, but still catches growth
+        try:
+            import resource
+        except ImportError:
+            return 0  # Windows has no stdlib RSS source; the RSS limit then never trips
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def take_sample(service: Any, clock: VirtualClock, latencies: Dict[str, List[float]]) -> Dict[str, Any]:
+    import requests
+
+    gc.collect()
+    objects = gc.get_objects()
+    sample = {
+        'virtual_hours': clock.monotonic() / 3600,
+        'rss_bytes': current_rss_bytes(),
+        'objects': len(objects),
+        'live_sessions': sum(1 for obj in objects if isinstance(obj, requests.Session)),
+        'error_length': max(len(str(service.last_error or '')), len(str(service.last_modbus_error or ''))),
+        'latency_ms': {
+            name: {
+                'cycles': len(values),
+                'p50': percentile(values, 50) * 1000,
+                'p99': percentile(values, 99) * 1000,
+            }
+            for name, values in latencies.items()
+        },
+    }
+    del objects
+    return sample
+
+
+def check_limits(samples: List[Dict[str, Any]], baseline: Dict[str, Any], limits: Dict[str, float]) -> List[str]:
+    failures = []
+    final = samples[-1]
+
+    rss_growth_mb = (final['rss_bytes'] - baseline['rss_bytes']) / (1024 * 1024)
+    if rss_growth_mb > limits['max_rss_growth_mb']:
+        failures.append(f"RSS grew {rss_growth_mb:.1f} MB (limit {limits['max_rss_growth_mb']} MB)")
+
+    object_growth = final['objects'] - baseline['objects']
+    if object_growth > limits['max_object_growth']:
+        failures.append(f"Object count grew by {object_growth} (limit {limits['max_object_growth']})")
+
+    live_sessions = max(sample['live_sessions'] for sample in samples)
+    if live_sessions > limits['max_live_sessions']:
+        failures.append(f"{live_sessions} live requests.Session objects (limit {limits['max_live_sessions']})")
+
+    error_length = max(sample['error_length'] for sample in samples)
+    if error_length > limits['max_error_length']:
+        failures.append(f"Error string reached {error_length} chars (limit {limits['max_error_length']})")
+
+    for sample in samples:
+        for name, stats in sample['latency_ms'].items():
+            if stats['p99'] > limits['max_cycle_latency_ms']:
+                failures.append(
+                    f"{name} p99 {stats['p99']:.1f} ms at hour {sample['virtual_hours']:.1f} "
+                    f"(limit {limits['max_cycle_latency_ms']} ms)"
+                )
+
+    return failures
+
+
+def run_soak(
+    duration: float,
+    api_interval: float = 30,
+    modbus_polling_interval: float = 1,
+    modbus_publish_interval: float = 10,
+    sample_interval: float = 3600,
+    warmup: Optional[float] = None,
+    limits: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Run the service loops for ``duration`` virtual seconds and report.
+
+    Patches the already imported service module in place and restores it
+    afterwards, so it can run inside a test process.
+    """
+    from varta_mqtt import service
+    from varta_mqtt.commands import RateController
+
+    limits = {**DEFAULT_LIMITS, **(limits or {})}
+    warmup = sample_interval if warmup is None else warmup
+    clock = VirtualClock(participants=SOAK_PARTICIPANTS)
+    varta = FakeVartaServer(clock, service.SENSORS)
+    modbus = FakeModbusServer(clock, list(service.ModbusPoller.REGISTER_MAP.values()))
+    publisher = PublishCounter()
+    window = LatencyWindow()
+
+    class TimedPoller(service.ModbusPoller):  # type: ignore[name-defined]
+        poll_values = window.timed('modbus_poll', service.ModbusPoller.poll_values)
+
+    overrides = {
+        'time': clock,
+        'client': publisher,
+        'API_URL': f"{varta.base_url}/cgi/ems_data.js",
+        'LOGIN_URL': f"{varta.base_url}/cgi/login.js",
+        'API_USERNAME': 'soak',
+        'API_PASSWORD': 'soak',
+        'INTERVAL_SECONDS': api_interval,
+        'MODBUS_HOST': '127.0.0.1',
+        'MODBUS_PORT': modbus.port,
+        'MODBUS_ENABLED': True,
+        'MODBUS_POLLING_INTERVAL_SECONDS': modbus_polling_interval,
+        'MODBUS_PUBLISH_INTERVAL_SECONDS': modbus_publish_interval,
+        'ModbusPoller': TimedPoller,
+        'api_rate': RateController(api_interval, clock=clock),
+        'modbus_rate': RateController(modbus_polling_interval, clock=clock),
+        'fetch_data': window.timed('api_fetch', service.fetch_data),
+        'publish_sensor_values': window.timed('api_publish', service.publish_sensor_values),
+        'session': None,
+        'http_session': None,
+        'session_cookies_restored': False,
+        'SESSION_COOKIE_FILE': None,
+        'last_login_time': 0,
+    }
+    originals = {name: getattr(service, name) for name in overrides}
+
+    varta.start()
+    modbus.start()
+    for name, value in overrides.items():
+        setattr(service, name, value)
+    service.stop_event.clear()
+
+    threads = [
+        threading.Thread(target=service.run_api_loop, daemon=True, name='soak-api'),
+        threading.Thread(target=service.run_modbus_loop, daemon=True, name='soak-modbus'),
+    ]
+    samples: List[Dict[str, Any]] = []
+    baseline: Optional[Dict[str, Any]] = None
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+
+        while clock.monotonic() < duration:
+            clock.sleep(min(sample_interval, duration - clock.monotonic()))
+            samples.append(take_sample(service, clock, window.drain()))
+            if baseline is None and clock.monotonic() >= warmup:
+                baseline = samples[-1]
+    finally:
+        service.stop_event.set()
+        clock.close()
+        for thread in threads:
+            thread.join(timeout=10)
+        for name, value in originals.items():
+            setattr(service, name, value)
+        service.stop_event.clear()
+        varta.stop()
+        modbus.stop()
+
+    baseline = baseline or samples[0]
+    return {
+        'virtual_hours': clock.monotonic() / 3600,
+        'wall_seconds': time.perf_counter() - started,
+        'api_requests': varta.requests,
+        'logins': varta.logins,
+        'modbus_requests': modbus.requests,
+        'mqtt_messages': publisher.messages,
+        'samples': samples,
+        'failures': check_limits(samples, baseline, limits),
+    }
+
+
+def _start_mqtt_sink() -> int:
+    """Accept and drain MQTT connections so the service module can import."""
+    sink = socket.socket()
+    sink.bind(('127.0.0.1', 0))
+    sink.listen()
+
+    def drain(conn: socket.socket) -> None:
+        while conn.recv(4096):
+            pass
+
+    def accept() -> None:
+        while True:
+            conn, _ = sink.accept()
+            threading.Thread(target=drain, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True, name='mqtt-sink').start()
+    return sink.getsockname()[1]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--days', type=float, default=1.0, help='virtual duration in days (default 1)')
+    parser.add_argument('--api-interval', type=float, default=30, help='API poll interval in seconds')
+    parser.add_argument('--modbus-interval', type=float, default=1, help='Modbus poll interval in seconds')
+    parser.add_argument('--modbus-publish-interval', type=float, default=10, help='Modbus publish interval')
+    parser.add_argument('--sample-hours', type=float, default=1.0, help='virtual hours between samples')
+    for name, default in DEFAULT_LIMITS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    args = parser.parse_args(argv)
+
+    # Never talk to the real battery or broker from a soak run
+    os.environ['API_URL'] = 'http://127.0.0.1/'
+    os.environ['MQTT_BROKER'] = '127.0.0.1'
+    os.environ['MQTT_PORT'] = str(_start_mqtt_sink())
+
+    from varta_mqtt.logging_config import configure_logging
+
+    configure_logging('WARNING')
+
+    report = run_soak(
+        duration=args.days * 86400,
+        api_interval=args.api_interval,
+        modbus_polling_interval=args.modbus_interval,
+        modbus_publish_interval=args.modbus_publish_interval,
+        sample_interval=args.sample_hours * 3600,
+        limits={name: getattr(args, name) for name in DEFAULT_LIMITS},
+    )
+
+    print(f"Soaked {report['virtual_hours']:.1f} virtual hours in {report['wall_seconds']:.1f}s")
+    print(f"API requests: {report['api_requests']}, logins: {report['logins']}, "
+          f"Modbus requests: {report['modbus_requests']}, MQTT messages: {report['mqtt_messages']}")
+    for sample in report['samples']:
+        latency = ', '.join(
+            f"{name} p50={stats['p50']:.1f}ms p99={stats['p99']:.1f}ms"
+            for name, stats in sorted(sample['latency_ms'].items())
+        )
+        print(f"  h{sample['virtual_hours']:7.1f}  rss={sample['rss_bytes'] / 1048576:6.1f}MB  "
+              f"objects={sample['objects']:7d}  sessions={sample['live_sessions']}  {latency}")
+
+    if report['failures']:
+        print('SOAK FAILED:')
+        for failure in report['failures']:
+            print(f"  - {failure}")
+        return 1
+
+    print('Soak passed')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""Run many Varta devices split across worker processes.
+
+Set ``SUPERVISOR_DEVICES_FILE`` to a JSON list of per-device settings, e.g.
+``[{"DEVICE_NAME": "varta_garage", "API_URL": "http://10.0.0.5/cgi/ems_data.js"}]``.
+Each entry overrides the shared environment (.env) for one device. Devices
+are distributed round-robin over ``SUPERVISOR_WORKERS`` processes; each
+process runs one isolated copy of the service module per device.
+"""
+import contextlib
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from varta_mqtt.logging_config import configure_logging
+
+
+logger = logging.getLogger(__name__)
+
+HEALTH_INTERVAL_SECONDS = 30.0
+RESTART_BACKOFF_SECONDS = 1.0
+MAX_RESTART_BACKOFF_SECONDS = 300.0
+# A worker that ran this long before exiting starts its backoff from scratch
+STABLE_RUN_SECONDS = 600.0
+
+Device = Dict[str, str]
+
+# Listeners each device must own: (port or path setting, host setting or None)
+DEVICE_LISTENERS = (
+    ('READ_API_PORT', 'READ_API_HOST'),
+    ('READ_API_SOCKET', None),
+    ('MODBUS_MIRROR_PORT', 'MODBUS_MIRROR_HOST'),
+)
+
+
+def load_devices(path: str, environ: Optional[Mapping[str, str]] = None) -> List[Device]:
+    """Read and validate the device list. Raises ValueError on bad input.
+
+    ``environ`` holds the shared settings (default: the process environment).
+    A shared SESSION_COOKIE_FILE is split into one file per device; listeners
+    that two devices would bind to the same address are rejected.
+    """
+    shared = os.environ if environ is None else environ
+    try:
+        with open(path, encoding='utf-8') as devices_file:
+            devices = json.load(devices_file)
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ValueError(f"Cannot read device list {path}: {exc}") from exc
+
+    if not isinstance(devices, list) or not devices:
+        raise ValueError("Device list must be a non-empty JSON list")
+
+    names = set()
+    for index, device in enumerate(devices):
+        if not isinstance(device, dict) or not device.get('DEVICE_NAME'):
+            raise ValueError(f"Device {index} must be an object with a DEVICE_NAME")
+        if device['DEVICE_NAME'] in names:
+            raise ValueError(f"Duplicate DEVICE_NAME: {device['DEVICE_NAME']}")
+        names.add(device['DEVICE_NAME'])
+
+    devices = [{key: str(value) for key, value in device.items()} for device in devices]
+    if shared.get('SESSION_COOKIE_FILE'):
+        root, ext = os.path.splitext(shared['SESSION_COOKIE_FILE'])
+        for device in devices:
+            device.setdefault('SESSION_COOKIE_FILE', f"{root}_{device['DEVICE_NAME']}{ext}")
+
+    _check_unique(devices, shared, 'SESSION_COOKIE_FILE', None)
+    for setting, host_setting in DEVICE_LISTENERS:
+        _check_unique(devices, shared, setting, host_setting)
+    return devices
+
+
+def _check_unique(devices: List[Device], shared: Mapping[str, str], setting: str, host_setting: Optional[str]) -> None:
+    owners: Dict[Tuple[str, str], str] = {}
+    for device in devices:
+        value = device.get(setting, shared.get(setting, ''))
+        if value in ('', '0'):
+            continue
+        host = device.get(host_setting, shared.get(host_setting, '')) if host_setting else ''
+        owner = owners.setdefault((host, value), device['DEVICE_NAME'])
+        if owner != device['DEVICE_NAME']:
+            raise ValueError(f"Devices {owner} and {device['DEVICE_NAME']} share {setting}={value}; set it per device")
+
+
+def shard_devices(devices: List[Device], workers: int) -> List[List[Device]]:
+    """Split devices round-robin into at most ``workers`` non-empty shards."""
+    count = max(1, min(workers, len(devices)))
+    return [devices[index::count] for index in range(count)]
+
+
+def restart_delay(failures: int) -> float:
+    return min(MAX_RESTART_BACKOFF_SECONDS, RESTART_BACKOFF_SECONDS * 2 ** max(0, failures - 1))
+
+
+@contextlib.contextmanager
+def _environment(overrides: Device) -> Iterator[None]:
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def load_device_service(device: Device) -> ModuleType:
+    """Import a private copy of the service module configured for one device.
+
+    The service reads its settings and connects to MQTT at import, so each
+    copy is executed with the device's overrides applied to the environment.
+    """
+    spec = importlib.util.find_spec('varta_mqtt.service')
+    assert spec is not None and spec.origin is not None
+    device_spec = importlib.util.spec_from_file_location(f"varta_mqtt.service.{device['DEVICE_NAME']}", spec.origin)
+    assert device_spec is not None and device_spec.loader is not None
+    module = importlib.util.module_from_spec(device_spec)
+    with _environment(device):
+        device_spec.loader.exec_module(module)
+    return module
+
+
+def run_worker(worker_id: int, devices: List[Device], health_queue: Any, health_interval: float) -> None:
+    """Worker process: run every device in a thread and report health.
+
+    Devices that fail to start (e.g. broker unreachable) are retried every
+    health interval; a device loop that dies takes the worker down so the
+    supervisor restarts it.
+    """
+    configure_logging(os.getenv('LOG_LEVEL', 'INFO'))
+    pending = {device['DEVICE_NAME']: device for device in devices}
+    running: Dict[str, Any] = {}
+    failed: Dict[str, str] = {}
+
+    while True:
+        for name, device in list(pending.items()):
+            try:
+                module = load_device_service(device)
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.exception("Worker %d: cannot start %s", worker_id, name)
+                failed[name] = str(exc)
+                continue
+            thread = threading.Thread(target=module.run_service, daemon=True, name=f'device-{name}')
+            thread.start()
+            running[name] = (module, thread)
+            del pending[name]
+            failed.pop(name, None)
+
+        time.sleep(health_interval)
+        report: Dict[str, Any] = {'worker': worker_id, 'pid': os.getpid(), 'at': time.time(), 'devices': {}}
+        for name, (module, thread) in running.items():
+            report['devices'][name] = {**module.health(), 'running': thread.is_alive()}
+        for name, error in failed.items():
+            report['devices'][name] = {'device': name, 'running': False, 'last_error': error}
+        health_queue.put(report)
+
+        if any(not thread.is_alive() for _, thread in running.values()):
+            logger.error("Worker %d: a device loop stopped, exiting for restart", worker_id)
+            raise SystemExit(1)
+
+
+class WorkerHandle:
+    """One worker process and its restart bookkeeping."""
+
+    def __init__(self, worker_id: int, devices: List[Device]) -> None:
+        self.worker_id = worker_id
+        self.devices = devices
+        self.process: Optional[Any] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.failures = 0
+        self.restart_at: Optional[float] = None
+
+
+class Supervisor:
+    """Keep one process per shard running and aggregate their health."""
+
+    def __init__(
+        self,
+        shards: List[List[Device]],
+        target: Callable[..., None] = run_worker,
+        context: Any = None,
+        health_interval: float = HEALTH_INTERVAL_SECONDS,
+    ) -> None:
+        self._context = context or multiprocessing.get_context('spawn')
+        self._target = target
+        self.health_interval = health_interval
+        self.health_queue = self._context.Queue()
+        self.workers = [WorkerHandle(index, shard) for index, shard in enumerate(shards)]
+        self.reports: Dict[int, Dict[str, Any]] = {}
+
+    def _spawn(self, worker: WorkerHandle) -> None:
+        worker.process = self._context.Process(
+            target=self._target,
+            args=(worker.worker_id, worker.devices, self.health_queue, self.health_interval),
+            name=f'varta-worker-{worker.worker_id}',
+            daemon=True,
+        )
+        worker.process.start()
+        worker.started_at = time.monotonic()
+        worker.restart_at = None
+        logger.info(
+            "Worker %d started (pid %s): %s",
+            worker.worker_id,
+            worker.process.pid,
+            ', '.join(device['DEVICE_NAME'] for device in worker.devices),
+        )
+
+    def start(self) -> None:
+        for worker in self.workers:
+            self._spawn(worker)
+
+    def check_workers(self) -> None:
+        """Schedule restarts for exited workers and start the ones that are due."""
+        now = time.monotonic()
+        for worker in self.workers:
+            process = worker.process
+            if worker.restart_at is None and process is not None and not process.is_alive():
+                if now - worker.started_at >= STABLE_RUN_SECONDS:
+                    worker.failures = 0
+                worker.failures += 1
+                delay = restart_delay(worker.failures)
+                worker.restart_at = now + delay
+                logger.error(
+                    "Worker %d exited with code %s; restarting in %.0fs",
+                    worker.worker_id,
+                    process.exitcode,
+                    delay,
+                )
+            if worker.restart_at is not None and now >= worker.restart_at:
+                worker.restarts += 1
+                self._spawn(worker)
+
+    def collect_health(self) -> None:
+        while True:
+            try:
+                report = self.health_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.reports[report['worker']] = report
+
+    def status(self) -> Dict[str, Any]:
+        devices: Dict[str, Any] = {}
+        alive = 0
+        for worker in self.workers:
+            worker_alive = worker.process is not None and worker.process.is_alive()
+            alive += worker_alive
+            reported = self.reports.get(worker.worker_id, {}).get('devices', {})
+            for device in worker.devices:
+                name = device['DEVICE_NAME']
+                devices[name] = {
+                    **reported.get(name, {'running': None}),
+                    'worker': worker.worker_id,
+                    'worker_alive': worker_alive,
+                }
+
+        healthy = alive == len(self.workers) and all(device.get('running') is not False for device in devices.values())
+        return {
+            'state': 'online' if healthy else 'degraded',
+            'workers': len(self.workers),
+            'workers_alive': alive,
+            'restarts': sum(worker.restarts for worker in self.workers),
+            'devices': devices,
+        }
+
+    def stop(self) -> None:
+        for worker in self.workers:
+            if worker.process is not None and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(timeout=10)
+
+
+def main() -> None:
+    from paho.mqtt import client as mqtt_client
+
+    load_dotenv()
+    configure_logging(os.getenv('LOG_LEVEL', 'INFO'))
+
+    devices = load_devices(os.environ['SUPERVISOR_DEVICES_FILE'])
+    worker_count = int(os.getenv('SUPERVISOR_WORKERS', 0)) or os.cpu_count() or 1
+    health_interval = float(os.getenv('SUPERVISOR_HEALTH_INTERVAL_SECONDS', HEALTH_INTERVAL_SECONDS))
+    name = os.getenv('SUPERVISOR_NAME', 'varta_supervisor')
+    topic = f"homeassistant/sensor/{name}/status"
+
+    mqtt = mqtt_client.Client()
+    mqtt.username_pw_set(os.getenv('MQTT_USERNAME'), os.getenv('MQTT_PASSWORD'))
+    mqtt.connect(os.environ['MQTT_BROKER'], int(os.getenv('MQTT_PORT', 1883)))
+    mqtt.loop_start()
+
+    discovery = {
+        'name': 'Supervisor Status',
+        'state_topic': f"{topic}/state",
+        'json_attributes_topic': f"{topic}/attributes",
+        'icon': 'mdi:server',
+        'device': {'identifiers': [name], 'name': 'Varta Supervisor', 'manufacturer': 'Varta', 'model': 'Supervisor'},
+        'unique_id': f"{name}_status",
+    }
+    mqtt.publish(f"{topic}/config", json.dumps(discovery), retain=True)
+
+    supervisor = Supervisor(shard_devices(devices, worker_count), health_interval=health_interval)
+    logger.info("Supervisor: %d devices on %d workers", len(devices), len(supervisor.workers))
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    supervisor.start()
+    next_status = time.monotonic()
+    try:
+        while not stop.is_set():
+            supervisor.collect_health()
+            supervisor.check_workers()
+            if time.monotonic() >= next_status:
+                status = supervisor.status()
+                mqtt.publish(f"{topic}/state", status['state'], retain=True)
+                mqtt.publish(f"{topic}/attributes", json.dumps(status), retain=True)
+                next_status = time.monotonic() + health_interval
+            stop.wait(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        supervisor.stop()
+        mqtt.publish(f"{topic}/state", 'offline', retain=True)
+        mqtt.loop_stop()
+
+
+if __name__ == '__main__':
+    main()
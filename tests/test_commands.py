@@ -0,0 +1,138 @@
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt.commands import MAX_COMMAND_MINUTES, RateController, parse_command
+
+
+class TestParseCommand:
+    """Test command payload parsing"""
+
+    def test_plain_refresh(self):
+        command = parse_command(b'refresh')
+
+        assert command['command'] == 'refresh'
+        assert command['target'] == 'all'
+
+    def test_json_boost(self):
+        command = parse_command(b'{"command": "boost", "target": "modbus", "interval": 0.5, "minutes": 2}')
+
+        assert command == {'command': 'boost', 'target': 'modbus', 'minutes': 2.0, 'interval': 0.5}
+
+    def test_duration_is_capped(self):
+        command = parse_command(b'{"command": "pause", "minutes": 10000}')
+
+        assert command['minutes'] == MAX_COMMAND_MINUTES
+
+    @pytest.mark.parametrize('payload', [
+        b'reboot',
+        b'{"command": "boost", "minutes": 5}',
+        b'{"command": "pause", "target": "wallbox"}',
+        b'{"command": "pause", "minutes": -1}',
+        b'{not json',
+        b'{"command": "boost", "interval": Infinity}',
+        b'{"command": "boost", "interval": NaN}',
+        b'{"command": "pause", "minutes": Infinity}',
+        b'{"command": "pause", "minutes": NaN}',
+        b'{"command": "boost", "interval": 1, "minutes": 1e400}',
+    ])
+    def test_invalid_commands(self, payload):
+        with pytest.raises(ValueError):
+            parse_command(payload)
+
+
+class TestRateController:
+    """Test boosts, pauses and refresh requests"""
+
+    @patch('varta_mqtt.clock.time.monotonic')
+    def test_boost_expires(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        rate = RateController(baseline=10)
+
+        rate.boost(0.5, duration=60)
+        assert rate.interval() == 0.5
+
+        mock_monotonic.return_value = 161.0
+        assert rate.interval() == 10
+
+    @patch('varta_mqtt.clock.time.monotonic')
+    def test_boosted_interval_is_none_without_boost(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        rate = RateController(baseline=10)
+        assert rate.boosted_interval() is None
+
+        rate.boost(0.5, duration=60)
+        assert rate.boosted_interval() == 0.5
+
+        mock_monotonic.return_value = 161.0
+        assert rate.boosted_interval() is None
+
+    def test_set_baseline_wakes_sleeper(self):
+        rate = RateController(baseline=10)
+
+        rate.set_baseline(2)
+
+        assert rate.interval() == 2
+        assert rate.sleep(5) is True
+
+    def test_boost_interval_has_floor(self):
+        rate = RateController(baseline=10)
+
+        rate.boost(0.001, duration=60)
+
+        assert rate.interval() == 0.2
+
+    def test_boost_interval_never_exceeds_baseline(self):
+        rate = RateController(baseline=10)
+
+        rate.boost(86400, duration=60)
+        assert rate.interval() == 10
+
+        rate.boost(1e300, duration=60)
+        assert rate.interval() == 10
+        assert rate.sleep(0) is True  # boost woke the sleeper, sleeping did not overflow
+
+    def test_boost_interval_follows_lower_baseline(self):
+        rate = RateController(baseline=10)
+        rate.boost(5, duration=60)
+
+        rate.set_baseline(2)
+
+        assert rate.interval() == 2
+
+    @pytest.mark.parametrize('interval, duration', [
+        (float('inf'), 60),
+        (float('nan'), 60),
+        (1, float('inf')),
+    ])
+    def test_boost_rejects_non_finite_values(self, interval, duration):
+        rate = RateController(baseline=10)
+
+        with pytest.raises(ValueError):
+            rate.boost(interval, duration)
+
+        assert rate.interval() == 10
+
+    @patch('varta_mqtt.clock.time.monotonic')
+    def test_pause_and_resume(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        rate = RateController(baseline=1)
+
+        rate.pause(30)
+        assert rate.is_paused() is True
+
+        rate.resume()
+        assert rate.is_paused() is False
+
+    def test_refresh_wakes_sleep(self):
+        rate = RateController(baseline=1)
+        rate.request_refresh()
+
+        assert rate.sleep(5) is True
+        assert rate.consume_refresh() is True
+        assert rate.consume_refresh() is False
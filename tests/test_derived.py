@@ -0,0 +1,67 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt.derived import DerivedMetrics, Expression
+
+
+class TestExpression:
+    """Test expression validation"""
+
+    def test_inputs_exclude_functions(self):
+        expression = Expression('x', 'max(0, a + b) if c > 0 else round(d, 1)')
+
+        assert expression.inputs == {'a', 'b', 'c', 'd'}
+        assert expression.evaluate({'a': 1, 'b': 2, 'c': 1, 'd': 0}) == 3
+
+    @pytest.mark.parametrize('source', [
+        '__import__("os")',
+        'a.real',
+        'a ** 999999',
+        '[a for a in b]',
+        'open("x")',
+        '"text"',
+        'a +',
+    ])
+    def test_rejects_unsafe_or_invalid(self, source):
+        with pytest.raises(ValueError):
+            Expression('x', source)
+
+
+class TestDerivedMetrics:
+    """Test dependency tracking and incremental recomputation"""
+
+    @pytest.fixture
+    def metrics(self):
+        return DerivedMetrics({
+            'total': 'a + b',
+            'share': '100 * a / total',
+            'other': 'c * 2',
+        })
+
+    def test_recomputes_only_affected_outputs(self, metrics):
+        assert metrics.update({'a': 1, 'b': 3, 'c': 5}) == {'total': 4, 'share': 25.0, 'other': 10}
+
+        assert metrics.update({'c': 6}) == {'other': 12}
+        assert metrics.update({'b': 1, 'c': 6}) == {'total': 2, 'share': 50.0}
+        assert metrics.update({'a': 1}) == {}
+
+    def test_missing_input_or_zero_division_skips_output(self, metrics):
+        assert metrics.update({'a': 0, 'b': 0}) == {'total': 0}
+        assert metrics.inputs == {'a', 'b', 'c'}
+
+    def test_forget_drops_input_and_dependents(self, metrics):
+        metrics.update({'a': 1, 'b': 3, 'c': 5})
+
+        assert metrics.forget({'b'}) == {'total', 'share'}
+        assert metrics.update({'a': 2, 'c': 5}) == {}
+
+        assert metrics.update({'b': 3}) == {'total': 5, 'share': 40.0}
+
+    def test_cycle_is_rejected(self):
+        with pytest.raises(ValueError, match='depend on each other'):
+            DerivedMetrics({'x': 'y + 1', 'y': 'x + 1'})
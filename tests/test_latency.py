@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt.latency import LatencyTracker, percentile
+
+
+class TestLatencyTracker:
+    """Test latency percentile tracking"""
+
+    def test_percentiles_in_milliseconds(self):
+        tracker = LatencyTracker()
+        for ms in range(1, 101):
+            tracker.record('api', ms / 1000)
+
+        summary = tracker.summary('api')
+
+        assert summary == {'count': 100, 'p50_ms': 50.0, 'p95_ms': 95.0, 'p99_ms': 99.0}
+
+    def test_window_keeps_recent_samples_only(self):
+        tracker = LatencyTracker(window=3)
+        for seconds in (10.0, 0.1, 0.2, 0.3):
+            tracker.record('modbus', seconds)
+
+        summary = tracker.summary('modbus')
+
+        assert summary['count'] == 3
+        assert summary['p99_ms'] == 300.0
+
+    def test_unknown_source_is_empty(self):
+        assert LatencyTracker().summary('api')['count'] == 0
+        assert percentile([], 50) == 0.0
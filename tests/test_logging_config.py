@@ -0,0 +1,116 @@
+import logging
+import queue
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt.logging_config import DroppingQueueHandler, RepeatSummaryFilter, configure_logging, report_dropped
+
+
+def make_record(message, level=logging.ERROR):
+    return logging.LogRecord('varta_mqtt.service', level, __file__, 1, message, (), None)
+
+
+class TestRepeatSummaryFilter:
+    """Test collapsing of repeated identical errors"""
+
+    @patch('varta_mqtt.logging_config.time.monotonic')
+    def test_repeats_are_suppressed_and_summarized(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        repeat_filter = RepeatSummaryFilter(window=60)
+
+        assert repeat_filter.filter(make_record('API fetch error: timeout')) is True
+        assert repeat_filter.filter(make_record('API fetch error: timeout')) is False
+        assert repeat_filter.filter(make_record('API fetch error: timeout')) is False
+
+        mock_monotonic.return_value = 61.0
+        summaries = repeat_filter.flush()
+
+        assert summaries == [(('varta_mqtt.service', logging.ERROR, 'API fetch error: timeout'), 2, 61.0)]
+        assert repeat_filter.filter(make_record('API fetch error: timeout')) is True
+
+    def test_different_messages_pass(self):
+        repeat_filter = RepeatSummaryFilter(window=60)
+
+        assert repeat_filter.filter(make_record('Login failed: 401')) is True
+        assert repeat_filter.filter(make_record('Login failed: 500')) is True
+
+    def test_info_is_never_suppressed(self):
+        repeat_filter = RepeatSummaryFilter(window=60)
+
+        assert repeat_filter.filter(make_record('Command: refresh', logging.INFO)) is True
+        assert repeat_filter.filter(make_record('Command: refresh', logging.INFO)) is True
+
+    @patch('varta_mqtt.logging_config.time.monotonic')
+    def test_expired_run_reported_inline(self, mock_monotonic):
+        mock_monotonic.return_value = 0.0
+        repeat_filter = RepeatSummaryFilter(window=60)
+        repeat_filter.filter(make_record('Modbus poll error: timeout'))
+        repeat_filter.filter(make_record('Modbus poll error: timeout'))
+
+        mock_monotonic.return_value = 70.0
+        record = make_record('Modbus poll error: timeout')
+
+        assert repeat_filter.filter(record) is True
+        assert 'repeated 1 more times' in record.getMessage()
+
+
+class TestDroppingQueueHandler:
+    """Test that a full log queue never blocks the caller"""
+
+    def test_full_queue_drops(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.emit(make_record('first'))
+        handler.emit(make_record('second'))
+
+        assert handler.dropped == 1
+
+    def test_drops_are_reported_once(self):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+        sink = Mock()
+        for index in range(3):
+            handler.emit(make_record(f'message {index}'))
+
+        assert report_dropped(handler, sink) == 2
+        assert report_dropped(handler, sink) == 0
+
+        sink.handle.assert_called_once()
+        record = sink.handle.call_args[0][0]
+        assert record.levelno == logging.WARNING
+        assert record.getMessage().startswith('2 log records dropped')
+
+
+class TestConfigureLogging:
+    """Test the repeat window setting"""
+
+    @pytest.fixture(autouse=True)
+    def restore_root_logger(self):
+        root = logging.getLogger()
+        handlers, level = list(root.handlers), root.level
+        yield
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in handlers:
+            root.addHandler(handler)
+        root.setLevel(level)
+
+    def test_zero_window_disables_collapsing(self):
+        threads = sum(thread.name == 'log-summary' for thread in threading.enumerate())
+
+        configure_logging('INFO', repeat_window=0)
+
+        assert logging.getLogger().handlers[0].filters == []
+        # The thread still runs to report dropped records
+        assert sum(thread.name == 'log-summary' for thread in threading.enumerate()) == threads + 1
+
+    @pytest.mark.parametrize('window', [-1, float('nan'), float('inf')])
+    def test_invalid_window_is_rejected(self, window):
+        with pytest.raises(ValueError):
+            configure_logging('INFO', repeat_window=window)
@@ -0,0 +1,73 @@
+import struct
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt.modbus_mirror import RegisterImage, start_modbus_mirror
+from varta_mqtt.modbus_poller import ModbusPoller
+
+
+def read_request(function_code, address, count=1):
+    return struct.pack('>BHH', function_code, address, count)
+
+
+class TestRegisterImage:
+    """Test answering reads from the register image"""
+
+    @patch('varta_mqtt.clock.time.monotonic', return_value=100.0)
+    def test_serves_signed_values_as_16_bit(self, mock_monotonic):
+        image = RegisterImage([1066, 1067], max_age=5)
+        image.update({1066: -200, 1067: 3100})
+
+        response = image.respond(read_request(3, 1066, 2))
+
+        assert response == struct.pack('>BBHH', 3, 4, 0xFF38, 3100)
+        assert image.respond(read_request(4, 1067))[0] == 4
+
+    @patch('varta_mqtt.clock.time.monotonic', return_value=100.0)
+    def test_unmapped_address(self, mock_monotonic):
+        image = RegisterImage([1066])
+        image.update({1066: 1})
+
+        assert image.respond(read_request(3, 1066, 2)) == bytes([0x83, 0x02])
+        assert image.respond(bytes([6, 0, 1, 0, 1])) == bytes([0x86, 0x01])
+
+    @patch('varta_mqtt.clock.time.monotonic')
+    def test_stale_or_unpolled_register_fails(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        image = RegisterImage([1066, 1078], max_age=5)
+        image.update({1066: 1})
+
+        assert image.respond(read_request(3, 1078)) == bytes([0x83, 0x0B])
+
+        mock_monotonic.return_value = 106.0
+        assert image.respond(read_request(3, 1066)) == bytes([0x83, 0x0B])
+
+
+class TestMirrorServer:
+    """Test the mirror against the real Modbus client"""
+
+    @pytest.fixture
+    def mirror(self):
+        image = RegisterImage(list(ModbusPoller.REGISTER_MAP.values()))
+        server = start_modbus_mirror(image, host='127.0.0.1', port=0)
+        yield image, server
+        server.stop()
+
+    def test_poller_reads_through_mirror(self, mirror):
+        pytest.importorskip('pymodbus')
+        image, server = mirror
+        image.update({1066: -1500, 1078: 420})
+
+        poller = ModbusPoller(host='127.0.0.1', port=server.port, timeout=2)
+        try:
+            values = poller.poll_values()
+        finally:
+            poller.close()
+
+        assert values == {'varta_ac_port_power_w': -1500, 'grid_power_total_w': 420}
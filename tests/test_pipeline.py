@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt.pipeline import LatestSlot, Stage
+
+
+class TestLatestSlot:
+    """Test the single-slot latest-wins buffer"""
+
+    def test_newer_value_replaces_unconsumed(self):
+        slot = LatestSlot()
+        slot.put('first')
+        slot.put('second')
+
+        assert slot.take(timeout=0) == 'second'
+        assert slot.dropped == 1
+
+    def test_take_times_out_when_empty(self):
+        slot = LatestSlot()
+
+        assert slot.take(timeout=0.01) is None
+
+
+class TestStage:
+    """Test stage hand-off between slots"""
+
+    def test_run_once_forwards_result(self):
+        inbox = LatestSlot()
+        outbox = LatestSlot()
+        stage = Stage('double', lambda value: value * 2, inbox=inbox, outbox=outbox)
+
+        inbox.put(21)
+
+        assert stage.run_once(timeout=0) is True
+        assert outbox.take(timeout=0) == 42
+        assert stage.cycles == 1
+
+    def test_run_once_without_input(self):
+        stage = Stage('idle', lambda value: value, inbox=LatestSlot())
+
+        assert stage.run_once(timeout=0) is False
+        assert stage.cycles == 0
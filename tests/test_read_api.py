@@ -0,0 +1,88 @@
+import json
+import socket
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt.read_api import SnapshotStore, start_read_api
+
+
+@pytest.fixture
+def store():
+    store = SnapshotStore()
+    store.update_entries('sensors', {'state_of_charge_pct': 75.5}, updated_at=1000.0)
+    return store
+
+
+class TestSnapshotStore:
+    """Test snapshot rendering and ETag handling"""
+
+    def test_render_is_cached_until_update(self, store):
+        first = store.render('sensors')
+        assert store.render('sensors') is first
+
+        store.update_entries('sensors', {'state_of_charge_pct': 76.0})
+        second = store.render('sensors')
+
+        assert second[0] != first[0]
+        assert json.loads(second[1])['state_of_charge_pct']['value'] == 76.0
+
+    def test_entries_carry_timestamp_and_fields(self, store):
+        store.update_entries('modbus', {'grid_power_total_w': -200.0}, updated_at=1010.0, sample_count=10)
+
+        document = json.loads(store.render('')[1])
+
+        assert document['modbus']['grid_power_total_w'] == {
+            'value': -200.0, 'updated_at': 1010.0, 'sample_count': 10,
+        }
+        assert document['sensors']['state_of_charge_pct']['updated_at'] == 1000.0
+        assert 'raw' not in document
+
+    def test_unknown_section(self, store):
+        assert store.render('unknown') is None
+
+
+class TestReadApiServer:
+    """Test the TCP and Unix socket listeners"""
+
+    def test_etag_returns_not_modified(self, store):
+        servers = start_read_api(store, host='127.0.0.1', port=0)
+        url = f"http://127.0.0.1:{servers[0].server_address[1]}/sensors"
+        try:
+            with urllib.request.urlopen(url) as response:
+                etag = response.headers['ETag']
+                assert json.loads(response.read())['state_of_charge_pct']['value'] == 75.5
+
+            request = urllib.request.Request(url, headers={'If-None-Match': etag})
+            with pytest.raises(urllib.error.HTTPError) as excinfo:
+                urllib.request.urlopen(request)
+            assert excinfo.value.code == 304
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+
+    def test_unix_socket(self, store, tmp_path):
+        socket_path = str(tmp_path / 'varta.sock')
+        servers = start_read_api(store, socket_path=socket_path)
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(socket_path)
+                sock.sendall(b'GET /sensors HTTP/1.0\r\n\r\n')
+                response = b''
+                while chunk := sock.recv(4096):
+                    response += chunk
+
+            head, body = response.split(b'\r\n\r\n', 1)
+            assert head.startswith(b'HTTP/1.0 200')
+            assert json.loads(body)['state_of_charge_pct']['value'] == 75.5
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
@@ -1,6 +1,8 @@
 import pytest
 import json
+import logging
 import time
+from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
 import requests
 import sys
@@ -61,13 +63,19 @@ def sample_api_response():
 def reset_globals():
     """Reset global variables before each test"""
     service.session = None
+    service.http_session = None
+    service.session_cookies_restored = False
     service.last_login_time = 0
     service.error_count = 0
     service.last_error = None
     service.latest_api_data = None
+    service.latest_api_measured_at = None
     service.modbus_error_count = 0
     service.last_modbus_error = ''
     service.fallback_active = False
+    service.last_published_power.clear()
+    service.last_immediate_publish.clear()
+    service.derived_metrics.reset()
     service.MODBUS_ENABLED = False
     yield
 
@@ -137,6 +145,24 @@ class TestLogin:
         # Assert cooldown is active
         assert result is False
         mock_publish.assert_any_call('login_status', 'cooldown')
+
+    @patch('varta_mqtt.service.time.time')
+    @patch('varta_mqtt.service.requests.Session')
+    @patch('varta_mqtt.service.publish_status')
+    def test_login_cooldown_warning_is_constant(self, mock_publish, mock_session_class, mock_time, caplog):
+        """Test that repeated cooldown warnings are identical so they collapse"""
+        mock_session_class.return_value.post.return_value = Mock(status_code=200)
+        mock_time.return_value = 1000.0
+        service.perform_login()
+
+        with caplog.at_level(logging.WARNING, logger='varta_mqtt.service'):
+            mock_time.return_value = 1005.0
+            service.perform_login()
+            mock_time.return_value = 1020.0
+            service.perform_login()
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert len(messages) == 2 and messages[0] == messages[1]
     
     @patch('varta_mqtt.service.requests.Session')
     @patch('varta_mqtt.service.publish_status')
@@ -187,7 +213,8 @@ class TestFetchData:
         # Assert
         assert result is not None
         mock_login.assert_called_once()
-        mock_publish.assert_any_call('service_status', 'online')
+        # Status is published by the publish stage, not on the fetch path
+        assert not any(call[0][0] == 'last_update' for call in mock_publish.call_args_list)
     
     @patch('varta_mqtt.service.perform_login')
     @patch('varta_mqtt.service.publish_status')
@@ -212,10 +239,22 @@ class TestFetchData:
         result = service.fetch_data()
         
         # Assert
-        assert result == sample_api_response
+        assert result['pulse']['procImg']['soc_pct'] == 75.5
         mock_login.assert_called_once()
         mock_publish.assert_any_call('login_status', 'expired')
     
+    @patch('varta_mqtt.service.publish_status')
+    def test_fetch_data_malformed_body(self, mock_publish):
+        """Test that an unparsable body counts as a fetch error"""
+        mock_session = Mock()
+        mock_response = Mock(status_code=200)
+        mock_response.json.side_effect = ValueError('Expecting value: line 1 column 12')
+        mock_session.get.return_value = mock_response
+        service.session = mock_session
+
+        assert service.fetch_data() is None
+        assert service.error_count == 1
+
     @patch('varta_mqtt.service.publish_status')
     def test_fetch_data_network_error(self, mock_publish):
         """Test handling of network errors during fetch"""
@@ -234,6 +273,80 @@ class TestFetchData:
         mock_publish.assert_any_call('error_count', '1')
 
 
+class TestPersistentSession:
+    """Test the pooled session and cookie persistence"""
+
+    @pytest.fixture
+    def cookie_file(self, tmp_path, monkeypatch):
+        path = tmp_path / 'session.json'
+        monkeypatch.setattr(service, 'SESSION_COOKIE_FILE', str(path))
+        return path
+
+    @patch('varta_mqtt.service.publish_status')
+    def test_relogin_reuses_pooled_session(self, mock_publish):
+        http = service._get_http_session()
+        with patch.object(http, 'post') as mock_post:
+            mock_post.return_value = Mock(status_code=200)
+
+            assert service.perform_login() is True
+            service.last_login_time = 0
+            assert service.perform_login() is True
+
+        assert service.session is http
+        assert service._get_http_session() is http
+
+    def test_cookies_round_trip(self, cookie_file):
+        http = service._new_http_session()
+        http.cookies.set('sessionid', 'abc123', domain='test.local', path='/')
+        service._save_session_cookies(http)
+
+        restored = service._new_http_session()
+
+        assert service._restore_session_cookies(restored) is True
+        assert restored.cookies.get('sessionid', domain='test.local') == 'abc123'
+
+    def test_expired_cookies_are_not_restored(self, cookie_file):
+        cookie_file.write_text(json.dumps([
+            {'name': 'sessionid', 'value': 'old', 'domain': 'test.local', 'path': '/', 'expires': 1},
+        ]))
+
+        assert service._restore_session_cookies(service._new_http_session()) is False
+
+    @pytest.mark.parametrize('content', [
+        '[1]',
+        '{"a": 1}',
+        '[{"value": "x"}]',
+        '[{"name": "sessionid", "value": "x", "expires": "soon"}]',
+        '[{"name": "sessionid", "value": 5}]',
+    ])
+    @patch('varta_mqtt.service.publish_status')
+    def test_malformed_cookie_file_is_ignored(self, mock_publish, cookie_file, content, sample_api_response):
+        cookie_file.write_text(content)
+        http = service._get_http_session()
+
+        with patch.object(http, 'post', return_value=Mock(status_code=200)), patch.object(http, 'get') as mock_get:
+            mock_get.return_value.status_code = 200
+            mock_get.return_value.json.return_value = sample_api_response
+            assert service.fetch_data() is not None
+
+        assert service.session_cookies_restored is False
+
+    @patch('varta_mqtt.service.perform_login')
+    @patch('varta_mqtt.service.publish_status')
+    def test_restored_cookies_skip_startup_login(self, mock_publish, mock_login, cookie_file, sample_api_response):
+        cookie_file.write_text(json.dumps([
+            {'name': 'sessionid', 'value': 'abc123', 'domain': 'test.local', 'path': '/', 'expires': None},
+        ]))
+        mock_response = Mock(status_code=200)
+        mock_response.json.return_value = sample_api_response
+
+        with patch('varta_mqtt.service.requests.Session.get', return_value=mock_response):
+            result = service.fetch_data()
+
+        assert result['pulse']['procImg']['soc_pct'] == 75.5
+        mock_login.assert_not_called()
+
+
 class TestPublishData:
     """Test cases for MQTT publishing"""
     
@@ -252,7 +365,7 @@ class TestPublishData:
         
         # Verify energy conversion from Ws to Wh
         for call in calls:
-            if 'grid_to_battery_charged_total_wh' in call[0][0]:
+            if call[0][0].endswith('grid_to_battery_charged_total_wh/state'):
                 value = float(call[0][1])
                 assert 277 < value < 278
     
@@ -267,6 +380,111 @@ class TestPublishData:
         mock_client.publish.assert_called_once_with(expected_topic, 'online', retain=True)
 
 
+class TestApiPipeline:
+    """Test the fetch/extract/publish pipeline stages"""
+
+    def test_extract_stage_updates_fallback_snapshot(self, sample_api_response):
+        values, measured_at = service._extract_stage(service.Measured(sample_api_response, 1000.0))
+
+        assert service.latest_api_data is sample_api_response
+        assert service.latest_api_measured_at == 1000.0
+        assert measured_at == 1000.0
+        assert values['state_of_charge_pct'] == 75.5
+        assert 'grid_power_total_w' in values
+
+    @patch('varta_mqtt.service.client')
+    @patch('varta_mqtt.service.time.time', return_value=1000.25)
+    def test_publish_attributes_carry_measured_at(self, mock_time, mock_client):
+        service.publish_sensor_values({'state_of_charge_pct': 75.5}, measured_at=1000.0)
+
+        topic = f"homeassistant/sensor/{service.DEVICE_NAME}/state_of_charge_pct/attributes"
+        payloads = {call[0][0]: call[0][1] for call in mock_client.publish.call_args_list}
+        attributes = json.loads(payloads[topic])
+        assert attributes['latency_ms'] == 250.0
+        assert attributes['source'] == 'api'
+        assert attributes['sample_count'] == 1
+        assert datetime.fromisoformat(attributes['measured_at']).timestamp() == 1000.0
+        assert service.latency_tracker.summary('api')['count'] >= 1
+
+    @patch('varta_mqtt.service.publish_sensor_values')
+    @patch('varta_mqtt.service.publish_status')
+    def test_publish_stage_reports_service_status(self, mock_publish, mock_publish_values):
+        service._publish_stage(service.Measured({'state_of_charge_pct': 75.5}, 1000.0))
+
+        mock_publish_values.assert_called_once_with({'state_of_charge_pct': 75.5}, measured_at=1000.0)
+        mock_publish.assert_any_call('service_status', 'online')
+        mock_publish.assert_any_call('last_update', datetime.fromtimestamp(1000.0).strftime('%Y-%m-%d %H:%M:%S'))
+
+    def test_pipeline_stats_in_health(self, monkeypatch):
+        inbox = service.LatestSlot()
+        stage = service.Stage('api-publish', lambda item: None, inbox=inbox)
+        monkeypatch.setattr(service, 'api_stages', [stage])
+        inbox.put(1)
+        inbox.put(2)
+        stage.run_once(timeout=0)
+
+        stats = service.health()['pipeline']['api-publish']
+
+        assert stats['cycles'] == 1
+        assert stats['dropped'] == 1
+        assert stats['last_duration_ms'] >= 0
+
+    def test_extract_skips_modbus_primary_sensors(self, sample_api_response):
+        service.MODBUS_ENABLED = True
+
+        values = service.extract_sensor_values(sample_api_response)
+
+        assert 'grid_power_total_w' not in values
+        assert 'varta_ac_port_power_w' not in values
+
+
+class TestDerivedSensors:
+    """Test derived sensors computed from published snapshots"""
+
+    @patch('varta_mqtt.service.client')
+    def test_api_snapshot_publishes_derived_values(self, mock_client, sample_api_response):
+        service.publish_data(sample_api_response)
+
+        payloads = {call[0][0]: call[0][1] for call in mock_client.publish.call_args_list}
+        prefix = f"homeassistant/sensor/{service.DEVICE_NAME}"
+        # 350 W PV - 200 W export - 150 W into the battery
+        assert float(payloads[f"{prefix}/house_consumption_w/state"]) == 0
+        assert float(payloads[f"{prefix}/self_sufficiency_pct/state"]) == 100
+        assert float(payloads[f"{prefix}/round_trip_efficiency_pct/state"]) == 50.0
+        assert json.loads(payloads[f"{prefix}/house_consumption_w/attributes"])['source'] == 'derived'
+
+    @patch('varta_mqtt.service.client')
+    def test_modbus_average_recomputes_only_dependents(self, mock_client, sample_api_response):
+        service.publish_data(sample_api_response)
+        mock_client.reset_mock()
+
+        service._publish_averaged_modbus_values({'grid_power_total_w': [400, 400]})
+
+        topics = {call[0][0] for call in mock_client.publish.call_args_list if call[0][0].endswith('/state')}
+        prefix = f"homeassistant/sensor/{service.DEVICE_NAME}"
+        assert f"{prefix}/house_consumption_w/state" in topics
+        assert f"{prefix}/self_sufficiency_pct/state" in topics
+        assert f"{prefix}/round_trip_efficiency_pct/state" not in topics
+
+    @patch('varta_mqtt.service.client')
+    def test_disabled_input_stops_dependent_outputs(self, mock_client, sample_api_response, monkeypatch):
+        service.publish_data(sample_api_response)
+        prefix = f"homeassistant/sensor/{service.DEVICE_NAME}"
+        assert 'house_consumption_w' in json.loads(service.snapshot_store.render('sensors')[1])
+
+        monkeypatch.setattr(service, 'DISABLED_SENSORS', frozenset({'grid_power_total_w'}))
+        service._apply_sensor_changes(frozenset())
+        mock_client.reset_mock()
+
+        service.publish_data(sample_api_response)
+        service._publish_averaged_modbus_values({'grid_power_total_w': [400, 400]})
+
+        topics = {call[0][0] for call in mock_client.publish.call_args_list}
+        assert f"{prefix}/house_consumption_w/state" not in topics
+        assert f"{prefix}/self_sufficiency_pct/state" not in topics
+        assert 'house_consumption_w' not in json.loads(service.snapshot_store.render('sensors')[1])
+
+
 class TestDiscovery:
     """Test cases for MQTT discovery"""
     
@@ -280,7 +498,7 @@ class TestDiscovery:
         calls = mock_client.publish.call_args_list
         
         # Check that all sensors from SENSORS dict are published
-        sensor_count = len(service.SENSORS)
+        sensor_count = len(service.SENSORS) + len(service.DERIVED_SENSORS)
         status_count = len(service.STATUS_SENSORS)
         total_expected = sensor_count + status_count
         
@@ -294,6 +512,10 @@ class TestDiscovery:
             assert 'device' in payload
             assert 'unique_id' in payload
 
+        for call in calls[:sensor_count]:
+            payload = json.loads(call[0][1])
+            assert payload['json_attributes_topic'] == payload['state_topic'].rsplit('/', 1)[0] + '/attributes'
+
 
 class TestIntegration:
     """Integration tests"""
@@ -365,7 +587,7 @@ class TestModbusFallbackBehavior:
         assert published is True
         calls = mock_client.publish.call_args_list
         published_topics = [call[0][0] for call in calls]
-        published_values = {call[0][0]: float(call[0][1]) for call in calls}
+        published_values = {call[0][0]: float(call[0][1]) for call in calls if call[0][0].endswith('/state')}
 
         ac_topic = f"homeassistant/sensor/{service.DEVICE_NAME}/varta_ac_port_power_w/state"
         grid_topic = f"homeassistant/sensor/{service.DEVICE_NAME}/grid_power_total_w/state"
@@ -374,6 +596,22 @@ class TestModbusFallbackBehavior:
         assert published_values[ac_topic] == 200.0
         assert published_values[grid_topic] == -200.0
 
+    @patch('varta_mqtt.service.client')
+    @patch('varta_mqtt.service.time.time', return_value=2010.0)
+    def test_averaged_values_carry_window(self, mock_time, mock_client):
+        samples = {'grid_power_total_w': [100, 200, 300]}
+        windows = {'grid_power_total_w': [2000.0, 2009.0]}
+
+        service._publish_averaged_modbus_values(samples, windows)
+
+        topic = f"homeassistant/sensor/{service.DEVICE_NAME}/grid_power_total_w/attributes"
+        payloads = {call[0][0]: call[0][1] for call in mock_client.publish.call_args_list}
+        attributes = json.loads(payloads[topic])
+        assert attributes['sample_count'] == 3
+        assert attributes['window_seconds'] == 9.0
+        assert attributes['latency_ms'] == 1000.0
+        assert attributes['source'] == 'modbus'
+
     def test_get_api_fallback_values(self, sample_api_response):
         service.latest_api_data = sample_api_response
         values = service._get_api_fallback_values()
@@ -382,5 +620,240 @@ class TestModbusFallbackBehavior:
         assert values['grid_power_total_w'] == -200
 
 
+class TestModbusImmediatePublish:
+    """Test threshold-triggered immediate publishing of Modbus power values."""
+
+    @pytest.fixture(autouse=True)
+    def threshold(self, monkeypatch):
+        monkeypatch.setattr(service, 'MODBUS_IMMEDIATE_THRESHOLD_W', 500.0)
+        monkeypatch.setattr(service, 'MODBUS_IMMEDIATE_MIN_GAP_SECONDS', 2.0)
+
+    @patch('varta_mqtt.service.client')
+    def test_large_step_publishes_immediately(self, mock_client):
+        service.last_published_power['grid_power_total_w'] = 100.0
+
+        published = service._publish_immediate_power_changes({'grid_power_total_w': 3100}, now=50.0)
+
+        assert published == {'grid_power_total_w'}
+        topic = f"homeassistant/sensor/{service.DEVICE_NAME}/grid_power_total_w/state"
+        mock_client.publish.assert_any_call(topic, '3100', retain=False)
+        assert service.last_published_power['grid_power_total_w'] == 3100
+
+    @patch('varta_mqtt.service.client')
+    def test_small_change_waits_for_average(self, mock_client):
+        service.last_published_power['grid_power_total_w'] = 100.0
+
+        published = service._publish_immediate_power_changes({'grid_power_total_w': 400}, now=50.0)
+
+        assert published == set()
+        mock_client.publish.assert_not_called()
+
+    @patch('varta_mqtt.service.client')
+    def test_min_gap_rate_limits(self, mock_client):
+        service.last_published_power['varta_ac_port_power_w'] = 0.0
+        service.last_immediate_publish['varta_ac_port_power_w'] = 49.0
+
+        published = service._publish_immediate_power_changes({'varta_ac_port_power_w': 2000}, now=50.0)
+
+        assert published == set()
+        mock_client.publish.assert_not_called()
+
+
+class TestCommands:
+    """Test MQTT command handling"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_rates(self, monkeypatch):
+        monkeypatch.setattr(service, 'api_rate', service.RateController(1))
+        monkeypatch.setattr(service, 'modbus_rate', service.RateController(1))
+
+    @patch('varta_mqtt.service.publish_status')
+    def test_refresh_wakes_api_loop(self, mock_publish):
+        service.handle_command(b'refresh')
+
+        assert service.api_rate.consume_refresh() is True
+        mock_publish.assert_called_with('last_command', 'refresh')
+
+    @patch('varta_mqtt.service.publish_status')
+    def test_boost_only_targets_modbus(self, mock_publish):
+        service.handle_command(b'{"command": "boost", "target": "modbus", "interval": 0.25, "minutes": 1}')
+
+        assert service.modbus_rate.interval() == 0.25
+        assert service.api_rate.interval() == 1
+
+    @patch('varta_mqtt.service.publish_status')
+    def test_pause_all(self, mock_publish):
+        service.handle_command(b'{"command": "pause", "minutes": 5}')
+
+        assert service.api_rate.is_paused() is True
+        assert service.modbus_rate.is_paused() is True
+
+    @patch('varta_mqtt.service.publish_status')
+    def test_invalid_command_is_reported(self, mock_publish):
+        service.handle_command(b'explode')
+
+        status_key, status_value = mock_publish.call_args[0]
+        assert status_key == 'last_command'
+        assert status_value.startswith('rejected')
+
+
+    @patch('varta_mqtt.service.handle_command')
+    def test_retained_command_is_ignored(self, mock_handle):
+        service._on_mqtt_message(None, None, Mock(payload=b'{"command": "pause"}', retain=True, topic=service.COMMAND_TOPIC))
+        service._on_mqtt_message(None, None, Mock(payload=b'refresh', retain=False, topic=service.COMMAND_TOPIC))
+
+        mock_handle.assert_called_once_with(b'refresh')
+
+    @pytest.mark.parametrize('boost', [False, True])
+    @patch('varta_mqtt.service._publish_latency_stats')
+    @patch('varta_mqtt.service._publish_modbus_source_status')
+    @patch('varta_mqtt.service._publish_immediate_power_changes', return_value=[])
+    @patch('varta_mqtt.service._publish_averaged_modbus_values', return_value=True)
+    def test_modbus_boost_shortens_publish_window(
+        self, mock_averaged, mock_immediate, mock_status, mock_latency, monkeypatch, boost
+    ):
+        polls = []
+
+        def poll_values():
+            polls.append(time.monotonic())
+            if len(polls) == 5:
+                service.stop_event.set()
+            return {'grid_power_total_w': 100}
+
+        poller = Mock(REGISTER_MAP=service.ModbusPoller.REGISTER_MAP, last_polled_at=1000.0, poll_values=poll_values)
+        monkeypatch.setattr(service, '_new_modbus_poller', lambda: poller)
+        monkeypatch.setattr(service, 'MODBUS_PUBLISH_INTERVAL_SECONDS', 60)
+        monkeypatch.setattr(service, 'modbus_rate', service.RateController(0.2))
+        if boost:
+            service.modbus_rate.boost(0.2, duration=60)
+
+        try:
+            service.run_modbus_loop()
+        finally:
+            service.stop_event.clear()
+
+        # Five polls 0.2 s apart: a 60 s window never closes, a boosted one closes between polls
+        if boost:
+            assert mock_averaged.call_count >= 3
+        else:
+            mock_averaged.assert_not_called()
+
+
+class TestConfigReload:
+    """Test applying .env changes at runtime"""
+
+    @pytest.fixture
+    def write_env(self, tmp_path, monkeypatch):
+        env_file = tmp_path / '.env'
+        monkeypatch.setattr(service, 'ENV_FILE', str(env_file))
+        monkeypatch.setattr(service, 'PROCESS_ENVIRON', dict(service.PROCESS_ENVIRON))
+        for name in service.read_settings():
+            monkeypatch.setattr(service, name, getattr(service, name))
+        monkeypatch.setattr(service, 'api_rate', service.RateController(service.INTERVAL_SECONDS))
+        monkeypatch.setattr(service, 'modbus_rate', service.RateController(service.MODBUS_POLLING_INTERVAL_SECONDS))
+        service.modbus_reconnect.clear()
+
+        def write(text):
+            env_file.write_text(text)
+
+        yield write
+        service.modbus_reconnect.clear()
+
+    def test_interval_change_retimes_loop(self, write_env):
+        write_env('INTERVAL_SECONDS=7\n')
+
+        applied = service.reload_config()
+
+        assert applied == {'INTERVAL_SECONDS'}
+        assert service.INTERVAL_SECONDS == 7
+        assert service.api_rate.interval() == 7
+
+    @patch('varta_mqtt.service.client')
+    def test_disabling_sensor_removes_only_its_discovery(self, mock_client, write_env, sample_api_response):
+        write_env('DISABLED_SENSORS=state_of_health_pct\n')
+
+        service.reload_config()
+
+        topic = f"homeassistant/sensor/{service.DEVICE_NAME}/state_of_health_pct/config"
+        mock_client.publish.assert_called_once_with(topic, '', retain=True)
+        assert 'state_of_health_pct' not in service.extract_sensor_values(sample_api_response)
+
+        mock_client.reset_mock()
+        write_env('DISABLED_SENSORS=\n')
+        service.reload_config()
+
+        payload = json.loads(mock_client.publish.call_args[0][1])
+        assert mock_client.publish.call_count == 1
+        assert payload['unique_id'] == f"{service.DEVICE_NAME}_state_of_health_pct"
+
+    def test_process_environment_wins_over_env_file(self, write_env, monkeypatch):
+        service.PROCESS_ENVIRON['INTERVAL_SECONDS'] = '3'
+        monkeypatch.setattr(service, 'INTERVAL_SECONDS', 3)
+        write_env('INTERVAL_SECONDS=9\nMODBUS_IMMEDIATE_THRESHOLD_W=50\n')
+        environ = dict(service.os.environ)
+
+        assert service.reload_config() == {'MODBUS_IMMEDIATE_THRESHOLD_W'}
+        assert service.INTERVAL_SECONDS == 3
+        assert dict(service.os.environ) == environ
+
+    def test_removed_key_falls_back_to_default(self, write_env):
+        write_env('INTERVAL_SECONDS=7\n')
+        service.reload_config()
+
+        write_env('')
+
+        assert service.reload_config() == {'INTERVAL_SECONDS'}
+        assert service.INTERVAL_SECONDS == 1
+
+    def test_broker_change_requires_restart(self, write_env):
+        broker = service.MQTT_BROKER
+        write_env('MQTT_BROKER=other-broker\n')
+
+        assert service.reload_config() == set()
+        assert service.MQTT_BROKER == broker
+
+    def test_modbus_endpoint_change_reconnects_poller(self, write_env, monkeypatch):
+        monkeypatch.setattr(service, 'MODBUS_ENABLED', True)
+        monkeypatch.setattr(service, 'MODBUS_HOST', '192.0.2.10')
+        service.PROCESS_ENVIRON['MODBUS_HOST'] = '192.0.2.10'
+        write_env('MODBUS_UNIT_ID=3\n')
+
+        applied = service.reload_config()
+
+        assert applied == {'MODBUS_UNIT_ID'}
+        assert service.modbus_reconnect.is_set()
+
+    def test_invalid_value_rejects_whole_reload(self, write_env):
+        interval = service.INTERVAL_SECONDS
+        write_env('INTERVAL_SECONDS=9\nMODBUS_TIMEOUT_SECONDS=soon\n')
+
+        assert service.reload_config() == set()
+        assert service.INTERVAL_SECONDS == interval
+
+    @patch('varta_mqtt.service.client')
+    def test_unknown_log_level_rejects_whole_reload(self, mock_client, write_env):
+        write_env('LOG_LEVEL=verbose\nDISABLED_SENSORS=state_of_health_pct\n')
+
+        assert service.reload_config() == set()
+        assert service.DISABLED_SENSORS == frozenset()
+        mock_client.publish.assert_not_called()
+
+        write_env('LOG_LEVEL=INFO\nDISABLED_SENSORS=state_of_health_pct\n')
+
+        assert service.reload_config() == {'DISABLED_SENSORS'}
+        assert 'state_of_health_pct' not in service.enabled_sensors()
+
+    @pytest.mark.parametrize('env', [
+        'INTERVAL_SECONDS=0\n',
+        'MODBUS_TIMEOUT_SECONDS=nan\n',
+        'MODBUS_IMMEDIATE_THRESHOLD_W=-5\n',
+        'READ_API_PORT=70000\n',
+    ])
+    def test_out_of_range_value_is_rejected(self, write_env, env):
+        write_env(env)
+
+        assert service.reload_config() == set()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
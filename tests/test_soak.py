@@ -0,0 +1,79 @@
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt import soak
+from varta_mqtt.clock import VirtualClock
+
+
+class TestVirtualClock:
+    """Test the discrete-event clock"""
+
+    def test_time_jumps_to_earliest_sleeper(self):
+        clock = VirtualClock(participants=2)
+        woke_at = []
+
+        def sleeper(seconds):
+            clock.sleep(seconds)
+            woke_at.append(clock.monotonic())
+
+        threads = [threading.Thread(target=sleeper, args=(s,)) for s in (3600, 60)]
+        for thread in threads:
+            thread.start()
+        threads[1].join(timeout=5)
+
+        assert woke_at == [60]
+        clock.close()
+        threads[0].join(timeout=5)
+
+    def test_wait_returns_when_event_set(self):
+        clock = VirtualClock(participants=2)
+        event = threading.Event()
+        event.set()
+
+        assert clock.wait(event, 3600) is True
+        assert clock.monotonic() == 0
+
+
+@pytest.mark.integration
+class TestSoak:
+    """Short soak run against the fake endpoints"""
+
+    def test_short_soak_passes(self):
+        report = soak.run_soak(
+            duration=1800,
+            modbus_polling_interval=5,
+            sample_interval=600,
+        )
+
+        assert report['failures'] == []
+        assert report['api_requests'] >= 60
+        assert report['logins'] >= 1
+        assert report['mqtt_messages'] > 0
+        assert len(report['samples']) == 3
+
+    def test_limits_report_regressions(self):
+        report = soak.run_soak(
+            duration=600,
+            modbus_polling_interval=5,
+            sample_interval=300,
+            limits={'max_live_sessions': 0},
+        )
+
+        assert any('requests.Session' in failure for failure in report['failures'])
+
+    def test_rss_fallback_without_proc(self, monkeypatch):
+        def no_proc(*args, **kwargs):
+            raise OSError('no /proc')
+
+        monkeypatch.setattr('builtins.open', no_proc)
+        assert soak.current_rss_bytes() > 0
+
+        # Windows: neither /proc nor the resource module
+        monkeypatch.setitem(sys.modules, 'resource', None)
+        assert soak.current_rss_bytes() == 0
@@ -0,0 +1,133 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from varta_mqtt import supervisor
+from varta_mqtt.supervisor import Supervisor, load_device_service, load_devices, restart_delay, shard_devices
+
+
+def crashing_worker(worker_id, devices, health_queue, health_interval):
+    health_queue.put({
+        'worker': worker_id,
+        'devices': {device['DEVICE_NAME']: {'running': True, 'error_count': 3} for device in devices},
+    })
+    raise SystemExit(1)
+
+
+class TestDeviceList:
+    """Test device list loading and sharding"""
+
+    def test_load_devices(self, tmp_path):
+        path = tmp_path / 'devices.json'
+        path.write_text(json.dumps([{'DEVICE_NAME': 'a', 'MODBUS_PORT': 502}, {'DEVICE_NAME': 'b'}]))
+
+        assert load_devices(str(path), environ={}) == [{'DEVICE_NAME': 'a', 'MODBUS_PORT': '502'}, {'DEVICE_NAME': 'b'}]
+
+    @pytest.mark.parametrize('content', ['[]', '{}', '[{"API_URL": "x"}]', '[{"DEVICE_NAME": "a"}, {"DEVICE_NAME": "a"}]', 'nope'])
+    def test_invalid_device_lists(self, tmp_path, content):
+        path = tmp_path / 'devices.json'
+        path.write_text(content)
+
+        with pytest.raises(ValueError):
+            load_devices(str(path))
+
+    def test_shared_cookie_file_is_split_per_device(self, tmp_path):
+        path = tmp_path / 'devices.json'
+        path.write_text(json.dumps([
+            {'DEVICE_NAME': 'a'},
+            {'DEVICE_NAME': 'b', 'SESSION_COOKIE_FILE': '/data/b.json'},
+        ]))
+
+        devices = load_devices(str(path), environ={'SESSION_COOKIE_FILE': '/data/cookies.json'})
+
+        assert [device['SESSION_COOKIE_FILE'] for device in devices] == ['/data/cookies_a.json', '/data/b.json']
+
+    @pytest.mark.parametrize('environ, overrides', [
+        ({'READ_API_PORT': '8080'}, [{}, {}]),
+        ({'MODBUS_MIRROR_PORT': '5020'}, [{'MODBUS_MIRROR_PORT': '5020'}, {}]),
+        ({'READ_API_SOCKET': '/run/varta.sock'}, [{}, {}]),
+        ({}, [{'SESSION_COOKIE_FILE': '/data/c.json'}, {'SESSION_COOKIE_FILE': '/data/c.json'}]),
+    ])
+    def test_shared_listeners_are_rejected(self, tmp_path, environ, overrides):
+        path = tmp_path / 'devices.json'
+        path.write_text(json.dumps([{'DEVICE_NAME': name, **extra} for name, extra in zip('ab', overrides)]))
+
+        with pytest.raises(ValueError, match='share'):
+            load_devices(str(path), environ=environ)
+
+    def test_listeners_set_per_device_are_accepted(self, tmp_path):
+        path = tmp_path / 'devices.json'
+        path.write_text(json.dumps([
+            {'DEVICE_NAME': 'a', 'READ_API_PORT': 8081},
+            {'DEVICE_NAME': 'b', 'READ_API_PORT': 8082},
+            {'DEVICE_NAME': 'c', 'READ_API_PORT': 0},
+            {'DEVICE_NAME': 'd', 'READ_API_PORT': 0},
+        ]))
+
+        assert len(load_devices(str(path), environ={'READ_API_PORT': '8080'})) == 4
+
+    def test_shard_round_robin(self):
+        devices = [{'DEVICE_NAME': str(index)} for index in range(5)]
+
+        shards = shard_devices(devices, 2)
+
+        assert [[d['DEVICE_NAME'] for d in shard] for shard in shards] == [['0', '2', '4'], ['1', '3']]
+        assert len(shard_devices(devices, 16)) == 5
+
+    def test_restart_backoff_is_capped(self):
+        assert [restart_delay(n) for n in (1, 2, 3)] == [1.0, 2.0, 4.0]
+        assert restart_delay(30) == supervisor.MAX_RESTART_BACKOFF_SECONDS
+
+
+class TestDeviceIsolation:
+    """Test per-device service module copies"""
+
+    def test_each_device_gets_its_own_module(self):
+        before = dict(os.environ)
+
+        first = load_device_service({'DEVICE_NAME': 'varta_one', 'INTERVAL_SECONDS': '7'})
+        second = load_device_service({'DEVICE_NAME': 'varta_two'})
+
+        assert first.DEVICE_NAME == 'varta_one'
+        assert first.INTERVAL_SECONDS == 7
+        assert second.DEVICE_NAME == 'varta_two'
+        assert first.snapshot_store is not second.snapshot_store
+        assert dict(os.environ) == before
+
+        first.client.disconnect()
+        second.client.disconnect()
+
+
+class TestSupervisor:
+    """Test restarts and health aggregation"""
+
+    def test_crashed_worker_is_restarted_and_reported(self, monkeypatch):
+        monkeypatch.setattr(supervisor, 'RESTART_BACKOFF_SECONDS', 0.0)
+        shards = shard_devices([{'DEVICE_NAME': 'a'}, {'DEVICE_NAME': 'b'}], 2)
+        sup = Supervisor(shards, target=crashing_worker, context=multiprocessing.get_context('fork'))
+        try:
+            sup.start()
+            for worker in sup.workers:
+                worker.process.join(timeout=10)
+            deadline = time.monotonic() + 5
+            while len(sup.reports) < 2 and time.monotonic() < deadline:
+                sup.collect_health()
+                time.sleep(0.01)
+
+            sup.check_workers()
+
+            assert all(worker.restarts == 1 for worker in sup.workers)
+            status = sup.status()
+            assert status['restarts'] == 2
+            assert status['devices']['a']['error_count'] == 3
+            assert status['devices']['b']['worker'] == 1
+        finally:
+            sup.stop()